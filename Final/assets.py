@@ -0,0 +1,112 @@
+""" Module for loading assets on background threads """
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame as pg
+
+from constants import Loading
+
+
+class ImageBank:
+    """ Process-wide cache of images converted for the display
+
+    Images are decoded on first request, or ahead of time by an AssetLoader. Every user of
+    the same file receives the same surface, which must be treated as read-only.
+    """
+    _images: dict[tuple, pg.Surface] = {}
+
+    @classmethod
+    def get_image(cls, filename: str, alpha: bool = True):
+        """ Method for getting a converted image, decoding it on first request
+
+        :param str filename - image file
+        :param bool alpha - keep per-pixel alpha
+        """
+        image = cls._images.get((filename, alpha))
+        if image is None:
+            image = cls.put_image(filename, pg.image.load(filename), alpha)
+        return image
+
+    @classmethod
+    def put_image(cls, filename: str, image: pg.Surface, alpha: bool = True):
+        """ Method for converting a decoded image and caching it, returns the converted image
+
+        :param str filename - image file the image was decoded from
+        :param pg.Surface image - decoded image
+        :param bool alpha - keep per-pixel alpha
+        """
+        image = image.convert_alpha() if alpha else image.convert()
+        cls._images[(filename, alpha)] = image
+        return image
+
+    @classmethod
+    def clear(cls):
+        """ Method for releasing every cached image """
+        cls._images.clear()
+
+
+class AssetLoader:
+    """ Class for running asset jobs on a thread pool and finishing them on the main thread
+
+    Jobs do the work that needs no display, such as decoding image files and reading cached
+    levels, and pygame releases the GIL while it decodes. A job's finish function receives
+    its result on the thread that polls the loader, so convert() and anything else touching
+    the display happens there.
+
+    :param int workers - number of loading threads
+    """
+    def __init__(self, workers: int = Loading.WORKERS.value):
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix='assets')
+        self.jobs = []
+        self.total = 0
+        self.finished = 0
+
+    def submit(self, func, *args, finish=None):
+        """ Method for running a function on a loading thread
+        :param func - function to call
+        :param args - arguments to call function with
+        :param finish - function called with the result when the loader is polled
+        """
+        self.jobs.append((self.pool.submit(func, *args), finish))
+        self.total += 1
+
+    def load_image(self, filename: str, alpha: bool = True):
+        """ Method for decoding an image on a loading thread into the ImageBank
+        :param str filename - image file
+        :param bool alpha - keep per-pixel alpha
+        """
+        self.submit(
+            pg.image.load, filename,
+            finish=lambda image: ImageBank.put_image(filename, image, alpha)
+        )
+
+    def poll(self):
+        """ Method for finishing every completed job, returns the fraction of jobs done """
+        pending = []
+        for future, finish in self.jobs:
+            if not future.done():
+                pending.append((future, finish))
+                continue
+
+            # errors raised by a job are raised again here
+            result = future.result()
+            if finish is not None:
+                finish(result)
+            self.finished += 1
+
+        self.jobs = pending
+        return self.progress
+
+    @property
+    def progress(self):
+        """ Method to get the fraction of submitted jobs finished """
+        return 1 if self.total == 0 else self.finished/self.total
+
+    @property
+    def done(self):
+        """ Method to check if every submitted job has finished """
+        return not self.jobs
+
+    def close(self):
+        """ Method for stopping the loading threads """
+        self.pool.shutdown()
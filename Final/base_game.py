@@ -1,10 +1,12 @@
 """ Module for initializing pygame functionalities """
 
+import os
 import sys
 from os import path
 
 import pygame as pg
 from base_screen import BaseScreen
+from controls import KeyboardInput
 
 
 class BaseGame:
@@ -13,9 +15,15 @@ class BaseGame:
     :param str title - title of window
     :param int width - pixel width of window
     :param int height - pixel height of window
+    :param bool headless - run without a visible window or frame cap
     """
-    def __init__(self, title: str, width: int, height: int):
+    def __init__(self, title: str, width: int, height: int, headless: bool = False):
         """ Initialize pygame window """
+        # dummy video driver must be selected before pygame initializes
+        self.headless = headless
+        if self.headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
         pg.init()
         pg.display.set_caption(title)
 
@@ -27,24 +35,40 @@ class BaseGame:
         self.surface = pg.display.set_mode((self.width, self.height))
         self.clock = pg.time.Clock()
 
+        # screen shown once the loop of the current screen returns
+        self.next_screen = None
+
         # current directory
         self.dir = path.dirname(__file__)
 
+        # key state read once per tick, replaced to record or replay input
+        self.controls = KeyboardInput()
+
+        # .csv or .json file screen phase timings are written to on exit
+        self.profile_path = None
+
     def set_screen(self, scr: BaseScreen):
-        """ Method for setting active screen on window """
-        # delete existing screen
-        if self.screen is not None:
-            del self.screen
-            self.screen = None
+        """ Method for setting active screen on window, screens are shown one after another
+        for as long as each sets the next before its loop returns
+        """
+        self.next_screen = scr
+        while self.next_screen is not None:
+            # delete existing screen
+            if self.screen is not None:
+                del self.screen
+                self.screen = None
 
-        self.screen = scr
+            self.screen, self.next_screen = self.next_screen, None
 
-        # show new screen
-        if self.screen is not None:
+            # show new screen
             self.screen.show()
 
     def quit(self):
         """ exit the game """
+        self.controls.close()
+        if self.profile_path is not None and self.screen is not None:
+            self.screen.profiler.dump(self.profile_path)
+
         pg.quit()
         sys.exit()
 
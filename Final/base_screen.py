@@ -1,13 +1,17 @@
 """ Module for calling game functionalities for screen """
 
 from abc import ABC, abstractmethod
-from os import path
+from time import perf_counter_ns
 
 import pygame as pg
 
 from sprites.character import Character
 from sprites.base_sprite import BaseSprite
-from constants import Health, Colors
+from sprites.physics_world import PhysicsWorld
+from hud import HealthBar
+from spatial_hash import SpatialHash
+from profiler import Profiler
+from constants import Health, Window
 
 
 class BaseScreen(ABC):
@@ -22,48 +26,120 @@ class BaseScreen(ABC):
         self.enemies = pg.sprite.Group()
         self.bullets = pg.sprite.Group()
 
+        # broadphase for collision queries
+        self.grid = SpatialHash()
+
+        # batched physics for every character on screen
+        self.physics = PhysicsWorld()
+
+        # hud layers
+        self.health_bar = None
+
+        # phase timings
+        self.profiler = Profiler()
+
+        # number of simulation ticks run
+        self.ticks = 0
+
+        # rects replaced while drawing interpolated positions
+        self.saved_rects = []
+
     def show(self):
-        """ Method for controlling game loop """
-        while True:
-            self.game.clock.tick(self.game.fps)
-            self.game.events()
+        """ Method for controlling game loop
+
+        The simulation runs at a fixed tick rate independent of the render rate. Ticks
+        owed for elapsed time are caught up to a limit and sprites are drawn interpolated
+        between their last two ticks. Headless mode runs one uncapped tick per frame.
+        Every phase is timed by the profiler, which is drawn on top in debug mode. The loop
+        returns once the game has a next screen to show.
+        """
+        tick = 1/Window.TICK_RATE.value
+        accumulator = 0
+        profiler = self.profiler
+
+        while self.game.next_screen is None:
+            if self.game.headless:
+                self.game.clock.tick()
+                profiler.time('events', self.game.events)
+                profiler.time('step', self.step)
+                profiler.time('draw', self.draw)
+                continue
+
+            accumulator += self.game.clock.tick(self.game.fps)/1000
+            start = perf_counter_ns()
+            profiler.time('events', self.game.events)
+
+            steps = min(int(accumulator/tick), Window.MAX_CATCH_UP.value)
+            profiler.time('step', self.step, steps)
+
+            # drop time that could not be caught up rather than spiral
+            accumulator = min(accumulator - steps*tick, tick)
+
+            self.interpolate(accumulator/tick)
+            dirty = profiler.time('draw', self.draw)
+            self.restore_rects()
+
+            if self.game.debug_mode:
+                rect = profiler.draw(self.game.surface)
+                if dirty is not None:
+                    dirty.append(rect)
+
+            if dirty is None:
+                profiler.time('display', pg.display.flip)
+            else:
+                profiler.time('display', pg.display.update, dirty)
+            profiler.record('frame', perf_counter_ns() - start)
+
+    def step(self, n_ticks: int = 1):
+        """ Method for advancing the simulation without the clock, events or drawing
+        :param int n_ticks - number of ticks to simulate
+        """
+        for _ in range(n_ticks):
             self.update()
-            self.draw()
+            self.ticks += 1
+
+    def interpolate(self, alpha: float):
+        """ Method for moving physics sprite rects between their last two ticks for drawing
+        :param float alpha - fraction of a tick elapsed since the current tick
+        """
+        positions = self.physics.interpolate(alpha)
+        for body, pos in zip(self.physics.bodies, positions):
+            if body is not None and body.rect is not None:
+                self.saved_rects.append((body, body.rect))
+                body.rect = body.rect.copy()
+                body.rect.midbottom = pos
+
+    def restore_rects(self):
+        """ Method for restoring rects moved by interpolate """
+        for body, rect in self.saved_rects:
+            body.rect = rect
+        self.saved_rects.clear()
 
     @abstractmethod
     def draw(self):
-        """ Method for drawing items to the screen """
+        """ Method for drawing items to the screen, returns the list of changed rects or None
+        if the whole screen changed
+        """
 
     @abstractmethod
     def update(self):
         """ Method for updating content on screen """
 
-    def draw_player_health_bar(self, x: float, y: float, pct: float):
-        """ Method for drawing player health bar
+    def draw_player_health_bar(self, x: float, y: float, pct: float, redraw: bool = True):
+        """ Method for drawing player health bar, returns the blitted rect or None if skipped
         :param float x - x coordinate of health bar
         :param float y - y coordinate of health bar
         :param float pct - remaining health factor apply to health bar fill
+        :param bool redraw - blit even if health has not changed since the last draw
         """
-        # prepare outline
-        image = pg.image.load(path.join(self.game.img_dir, Health.PLAYER_BAR.value))
-        image = pg.transform.scale(
-            image, (Health.PLAYER_BAR_WIDTH.value, Health.PLAYER_BAR_HEIGHT.value)
-        )
-        image.set_colorkey(Colors.BLACK.value)
+        # outline and fill levels are rendered once and cached
+        if self.health_bar is None:
+            self.health_bar = HealthBar(self.game.img_dir)
 
         # position
         x = x - Health.PLAYER_BAR_WIDTH.value/2
 
-        fill = pct*(Health.PLAYER_BAR_WIDTH.value - 42)
-        fill_rect = pg.Rect(x + 42, y + 35, fill, Health.PLAYER_BAR_HEIGHT.value/4)
-
-        if pct > 0.3:
-            color = Colors.LIGHT_ORANGE.value
-        else:
-            color = Colors.RED.value
-
-        self.game.surface.blit(image, (x, y))
-        pg.draw.rect(self.game.surface, color, fill_rect)
+        return self.health_bar.draw(self.game.surface, (x, y), pct, redraw)
 
     def handle_collision(self, character: Character, hit: BaseSprite, tolerance: int):
         """ Method for controliing collisions between characters and obstacles
@@ -0,0 +1,204 @@
+""" Module for running headless levels in parallel to sweep enemy properties """
+
+import argparse
+import ast
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+from time import perf_counter_ns
+from typing import NamedTuple
+
+from game import Game
+from level import CHARACTERS, Level
+from level_compiler import load_level
+from controls import ReplayInput
+from sprites.animation_bank import AnimationBank
+from enemies import EnemyProps, MeleeEnemy, ShooterEnemy
+from constants import Health, Window
+
+# enemy classes by spawn name, overrides are keyed '<spawn name>.<EnemyProps field>'
+ENEMIES = {'melee': MeleeEnemy, 'shooter': ShooterEnemy}
+
+COLUMNS = ['detection_tick', 'detection_s', 'hits', 'damage', 'ticks', 'ticks_per_s']
+
+
+class Trial(NamedTuple):
+    """ One headless run of a level with its own enemy properties and input """
+    overrides: dict
+    replay: str = None
+    ticks: int = None
+    source: str = None
+
+
+def make_game():
+    """ Function for creating a headless game to simulate levels in """
+    game = Game(Window.TITLE.value, Window.WIDTH.value, Window.HEIGHT.value, headless=True)
+    game.fps = Window.FPS.value
+    game.debug_mode = False
+    return game
+
+
+def enemy_props(overrides: dict):
+    """ Function for getting the EnemyProps of each enemy class with overrides applied
+    :param dict overrides - values by '<spawn name>.<field>' key
+    """
+    fields = {}
+    for key, value in overrides.items():
+        name, field = key.split('.')
+        fields.setdefault(name, {})[field] = value
+    return {name: ENEMIES[name].PROPS._replace(**values) for name, values in fields.items()}
+
+
+def run_trial(trial: Trial):
+    """ Function for simulating a level headless and measuring how its enemies perform,
+    returns a result record
+
+    :param Trial trial - overrides, recording and length of run
+    """
+    game = make_game()
+    ticks = trial.ticks
+    if trial.replay is not None:
+        game.controls = ReplayInput(trial.replay)
+        if ticks is None:
+            ticks = len(game.controls)
+
+    start = perf_counter_ns()
+    lvl = Level(game, source=trial.source, props=enemy_props(trial.overrides))
+    game.screen = lvl
+    lvl.profiler.enabled = False
+    load_ns = perf_counter_ns() - start
+
+    # first tick any enemy has a target
+    detection_tick = None
+    start = perf_counter_ns()
+    for _ in range(ticks):
+        lvl.step()
+        if detection_tick is None and lvl.detector.detected.any():
+            detection_tick = lvl.ticks
+    run_ns = perf_counter_ns() - start
+
+    return dict(
+        trial.overrides,
+        replay=None if trial.replay is None else path.basename(trial.replay),
+        detection_tick=detection_tick,
+        detection_s=None if detection_tick is None else detection_tick/Window.TICK_RATE.value,
+        hits=lvl.player.hits,
+        damage=Health.PLAYER_HEALTH.value - lvl.player.health,
+        ticks=ticks,
+        ticks_per_s=ticks/(run_ns/1e9),
+        load_ms=load_ns/1e6
+    )
+
+
+def make_trials(sweeps: dict, replays: list, ticks: int = None, source: str = None):
+    """ Function for getting a trial for every combination of swept values and recordings
+    :param dict sweeps - list of values by '<spawn name>.<field>' key
+    :param list replays - recordings to play, None runs with no keys held
+    :param int ticks - ticks per trial, the length of the recording when None
+    :param str source - level source, the tiled map of level 1 when None
+    """
+    keys = list(sweeps)
+    return [
+        Trial(dict(zip(keys, values)), replay, ticks, source)
+        for values in itertools.product(*sweeps.values())
+        for replay in replays
+    ]
+
+
+def run_batch(trials: list[Trial], workers: int = None):
+    """ Function for running trials across processes, returns records in trial order
+    :param list[Trial] trials - trials to run
+    :param int workers - number of processes, one per core when None
+    """
+    # levels and the atlas are built once up front so workers only read the cache
+    game = make_game()
+    AnimationBank.load_atlas(
+        [cls.sheet(game.img_dir) for cls in CHARACTERS], game.cache_dir
+    )
+    for source in {trial.source for trial in trials}:
+        if source is None:
+            source = Level.default_source(game)
+        load_level(source, game.cache_dir)
+
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(run_trial, trials))
+
+
+def format_table(records: list[dict], columns: list[str]):
+    """ Function for laying out records as an aligned text table
+    :param list[dict] records - rows of table
+    :param list[str] columns - keys of records to show
+    """
+    def cell(value):
+        if value is None:
+            return '-'
+        return f'{value:.2f}' if isinstance(value, float) else str(value)
+
+    rows = [columns] + [[cell(record.get(column)) for column in columns] for record in records]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return '\n'.join(
+        '  '.join(value.rjust(width) for value, width in zip(row, widths)) for row in rows
+    )
+
+
+def write_records(records: list[dict], filename: str):
+    """ Function for writing records to a .csv file, or a JSON lines file for any other name
+    :param list[dict] records - records to write
+    :param str filename - path of file to write
+    """
+    with open(filename, 'w', newline='', encoding='utf-8') as file:
+        if filename.endswith('.csv'):
+            writer = csv.DictWriter(file, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            for record in records:
+                file.write(json.dumps(record) + '\n')
+
+
+def main():
+    """ Function for running a sweep from the command line """
+    parser = argparse.ArgumentParser(description='Sweep enemy properties on headless levels')
+    parser.add_argument(
+        '--sweep', nargs='+', action='append', default=[], metavar=('KEY', 'VALUE'),
+        help='property to sweep as <melee|shooter>.<field> followed by its values'
+    )
+    parser.add_argument(
+        '--replay', nargs='+', default=[None], help='recordings to play in every trial'
+    )
+    parser.add_argument('--ticks', type=int, help='ticks per trial, defaults to recording length')
+    parser.add_argument('--source', help='.tmx or text map, defaults to level 1')
+    parser.add_argument('--workers', type=int, help='processes to run, defaults to one per core')
+    parser.add_argument('--output', help='.csv or JSON lines file to write records to')
+    args = parser.parse_args()
+
+    sweeps = {}
+    for key, *values in args.sweep:
+        name, _, field = key.partition('.')
+        if name not in ENEMIES or field not in EnemyProps._fields:
+            parser.error(f'unknown property {key}')
+        if not values:
+            parser.error(f'no values to sweep for {key}')
+        try:
+            sweeps[key] = [ast.literal_eval(value) for value in values]
+        except (ValueError, SyntaxError):
+            parser.error(f'values of {key} must be Python literals')
+
+    if args.ticks is None and None in args.replay:
+        parser.error('--ticks is required without a recording to replay')
+
+    trials = make_trials(sweeps, args.replay, args.ticks, args.source)
+    records = run_batch(trials, args.workers or os.cpu_count())
+
+    print(format_table(records, list(sweeps) + ['replay'] + COLUMNS))
+    if args.output is not None:
+        write_records(records, args.output)
+
+
+if __name__ == '__main__':
+    main()
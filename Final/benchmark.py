@@ -0,0 +1,165 @@
+""" Module for benchmarking level phases on procedurally generated stress levels """
+
+import argparse
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter_ns
+
+from game import Game
+from level import Level
+from map import MapObject
+from constants import Window, TILESIZE
+
+
+def generate_objects(
+        n_platforms: int, n_melee: int, n_shooters: int, seed: int = 0,
+        size: tuple[int, int] = (Window.WIDTH.value, Window.HEIGHT.value)
+):
+    """ Function for generating map objects of a stress level
+
+    :param int n_platforms - number of platforms including the ground
+    :param int n_melee - number of melee enemies
+    :param int n_shooters - number of shooter enemies
+    :param int seed - seed for the random layout
+    :param tuple[int, int] size - (width, height) of the level
+    """
+    rng = random.Random(seed)
+    width, height = size
+
+    # ground spans the whole level, ledges are tile aligned
+    platforms = [MapObject('platform', 0, height - TILESIZE, width, TILESIZE)]
+    rows = range(3, height//TILESIZE - 4)
+    for _ in range(n_platforms - 1):
+        w = rng.randint(4, 12)*TILESIZE
+        x = rng.randrange(0, max(width - w, 1), TILESIZE)
+        y = rng.choice(rows)*TILESIZE
+        platforms.append(MapObject('platform', x, y, w, TILESIZE))
+
+    # player spawns first since enemies target it on creation
+    objects = [MapObject('player', width/2, height - 2*TILESIZE - 75, 45.5, 75)]
+    objects.extend(platforms)
+
+    for name, count in (('melee', n_melee), ('shooter', n_shooters)):
+        for _ in range(count):
+            plt = rng.choice(platforms)
+            x = rng.uniform(plt.x, plt.x + plt.width - 30)
+            objects.append(MapObject(name, x, plt.y - 30, 30, 25))
+
+    return objects
+
+
+def run_benchmark(
+        n_platforms: int, n_melee: int, n_shooters: int, ticks: int,
+        alloc_ticks: int = 0, seed: int = 0, dirty: bool = False, screens: int = 1
+):
+    """ Function for timing each level phase on a generated level, returns a result record
+
+    :param int n_platforms - number of platforms including the ground
+    :param int n_melee - number of melee enemies
+    :param int n_shooters - number of shooter enemies
+    :param int ticks - number of ticks to time
+    :param int alloc_ticks - number of extra ticks to trace allocations over
+    :param int seed - seed for the random layout
+    :param bool dirty - draw with the dirty rect renderer
+    :param int screens - level width in window widths
+    """
+    game = Game(Window.TITLE.value, Window.WIDTH.value, Window.HEIGHT.value, headless=True)
+    game.fps = Window.FPS.value
+    game.dirty_rendering = dirty
+    game.debug_mode = False
+
+    start = perf_counter_ns()
+    size = (screens*Window.WIDTH.value, Window.HEIGHT.value)
+    lvl = Level(game, generate_objects(n_platforms, n_melee, n_shooters, seed, size))
+    game.screen = lvl
+    load_ns = perf_counter_ns() - start
+
+    phases = dict(lvl.phases, draw=lvl.draw)
+    lvl.profiler.enabled = False
+    totals = dict.fromkeys(phases, 0)
+
+    for _ in range(ticks):
+        for name, phase in phases.items():
+            start = perf_counter_ns()
+            phase()
+            totals[name] += perf_counter_ns() - start
+        lvl.ticks += 1
+
+    ms_per_tick = {name: total/ticks/1e6 for name, total in totals.items()}
+    ms_per_tick['total'] = sum(ms_per_tick.values())
+
+    record = {
+        'platforms': n_platforms,
+        'melee': n_melee,
+        'shooters': n_shooters,
+        'ticks': ticks,
+        'dirty': dirty,
+        'screens': screens,
+        'load_ms': load_ns/1e6,
+        'ms_per_tick': ms_per_tick
+    }
+
+    # allocations are traced separately since tracing distorts timings
+    if alloc_ticks > 0:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for _ in range(alloc_ticks):
+            for phase in phases.values():
+                phase()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+        record['alloc_blocks_per_tick'] = blocks/alloc_ticks
+        record['alloc_peak_kb'] = peak/1024
+
+    record['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return record
+
+
+def main():
+    """ Function for running benchmarks from the command line, one process per level """
+    parser = argparse.ArgumentParser(description='Benchmark level phases on stress levels')
+    parser.add_argument('--platforms', type=int, default=16, help='platforms per level')
+    parser.add_argument(
+        '--enemies', type=int, nargs='+', default=[10, 100, 1000, 10000],
+        help='enemy counts to benchmark'
+    )
+    parser.add_argument(
+        '--shooter-share', type=float, default=0.5, help='fraction of enemies that shoot'
+    )
+    parser.add_argument('--ticks', type=int, default=300, help='timed ticks per level')
+    parser.add_argument('--alloc-ticks', type=int, default=30, help='allocation traced ticks')
+    parser.add_argument('--seed', type=int, default=0, help='layout seed')
+    parser.add_argument('--dirty', action='store_true', help='use the dirty rect renderer')
+    parser.add_argument('--screens', type=int, default=1, help='level width in window widths')
+    parser.add_argument('--output', help='JSON lines file to write, defaults to stdout')
+    args = parser.parse_args()
+
+    # a fresh process per level keeps peak RSS comparable between runs
+    ctx = multiprocessing.get_context('spawn')
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for count in args.enemies:
+            n_shooters = round(count*args.shooter_share)
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                record = pool.submit(
+                    run_benchmark, args.platforms, count - n_shooters, n_shooters,
+                    args.ticks, args.alloc_ticks, args.seed, args.dirty, args.screens
+                ).result()
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+""" Module for mapping world coordinates to the screen """
+
+import pygame as pg
+
+
+class Camera:
+    """ Class for controlling the viewport of a world that may be larger than the screen
+
+    :param int width - pixel width of viewport
+    :param int height - pixel height of viewport
+    :param pg.Rect world - bounds of the world in pixels
+    """
+    def __init__(self, width: int, height: int, world: pg.Rect):
+        self.rect = pg.Rect(0, 0, width, height)
+        self.world = world
+
+    def follow(self, target: pg.Rect):
+        """ Method for centering the viewport on a rect, kept inside the world
+        :param pg.Rect target - rect to center on
+        """
+        self.rect.center = target.center
+
+        # worlds smaller than the viewport stay pinned to the top left
+        self.rect.right = min(self.rect.right, self.world.right)
+        self.rect.bottom = min(self.rect.bottom, self.world.bottom)
+        self.rect.left = max(self.rect.left, self.world.left)
+        self.rect.top = max(self.rect.top, self.world.top)
+
+    def apply(self, rect: pg.Rect):
+        """ Method for converting a world rect to a screen rect
+        :param pg.Rect rect - rect in world coordinates
+        """
+        return rect.move(-self.rect.x, -self.rect.y)
+
+    def visible(self, rect: pg.Rect):
+        """ Method for checking if a world rect is inside the viewport
+        :param pg.Rect rect - rect in world coordinates
+        """
+        return self.rect.colliderect(rect)
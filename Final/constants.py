@@ -3,10 +3,15 @@
 from enum import Enum
 
 TILESIZE = 32
+CELL_SIZE = 128
+CHUNK_SIZE = 512
 PLT_COL_TOL = 32
 GRAVITY = 0.98
 BULLET_ACC = 0.10
 BULLET_DMG = 20
+BULLET_SPEED = 4
+BULLET_MAX_SPEED = 12
+BULLET_POOL = 256
 
 # window
 class Window(Enum):
@@ -15,6 +20,8 @@ class Window(Enum):
     WIDTH = 1280
     HEIGHT = 720
     FPS = 60
+    TICK_RATE = 60
+    MAX_CATCH_UP = 5
 
 
 # spritesheets
@@ -23,6 +30,7 @@ class Spritesheet(Enum):
     PLAYER_SPRITESHEET = 'player_spritesheet.png'
     MELEE_ENEMY_SPRITESHEET = 'melee_enemy_spritesheet.png'
     SHOOTER_ENEMY_SPRITESHEET = 'shooter_enemy_spritesheet.png'
+    BULLET = 'bullet.png'
 
 class Health(Enum):
     """ Image constants """
@@ -51,6 +59,7 @@ class MeleeEnemy(Enum):
     MAX_FALL_SPEED = 4
     DECELERATION = 2
     ACC = 0.05
+    JUMP = -23
     MAX_DIST = 250
     DETECTION_BOX = (0, 0, 400, 110)
     MELEE_RANGE = 40
@@ -66,10 +75,37 @@ class ShooterEnemy(Enum):
     ACC = 0.025
     MAX_DIST = 200
     DETECTION_BOX = (0, 0, 600, 100)
+    SHOOT_COOLDOWN = 90
     MELEE_RANGE = 80
     DAMAGE = 15
 
 
+# simulation level of detail
+class Lod(Enum):
+    """ Enemy level of detail constants """
+    NEAR_DIST = 1500
+    DORMANT_DIST = 3000
+    MID_INTERVAL = 4
+
+
+# profiling
+class Profile(Enum):
+    """ Profiler constants """
+    WINDOW = 600
+    REFRESH = 30
+    FONT_SIZE = 20
+    COLUMN_WIDTH = 50
+
+
+# asset loading
+class Loading(Enum):
+    """ Asset loading constants """
+    WORKERS = 4
+    BAR_WIDTH = 400
+    BAR_HEIGHT = 24
+    FONT_SIZE = 32
+
+
 # colors
 class Colors(Enum):
     """ Color enemy constants """
@@ -0,0 +1,99 @@
+""" Module for reading, recording and replaying per-tick key state """
+
+import struct
+from abc import ABC, abstractmethod
+
+import pygame as pg
+
+
+class InputSource(ABC):
+    """ Class for providing the state of the game keys once per simulation tick
+
+    The state of every key the game reads is packed into one bitmask per tick, which can be
+    indexed like pg.key.get_pressed().
+    """
+    KEYS = (pg.K_a, pg.K_d, pg.K_w, pg.K_j)
+    BITS = {key: 1 << i for i, key in enumerate(KEYS)}
+
+    # magic, format version, number of keys
+    HEADER = struct.Struct('<4sBB')
+    MAGIC = b'EMIN'
+    VERSION = 1
+
+    def __init__(self):
+        self.mask = 0
+        self.ticks = 0
+
+    def __getitem__(self, key: int):
+        return bool(self.mask & self.BITS[key])
+
+    @abstractmethod
+    def read(self):
+        """ Method for getting the key bitmask of the next tick """
+
+    def poll(self):
+        """ Method for advancing to the next tick """
+        self.mask = self.read()
+        self.ticks += 1
+
+    def close(self):
+        """ Method for finishing with the source """
+
+
+class KeyboardInput(InputSource):
+    """ Class for reading key state from the keyboard """
+    def read(self):
+        keys = pg.key.get_pressed()
+        mask = 0
+        for key, bit in self.BITS.items():
+            if keys[key]:
+                mask |= bit
+        return mask
+
+
+class RecordingInput(KeyboardInput):
+    """ Class for reading the keyboard and saving every tick to a file on close
+
+    :param str filename - path of recording to write
+    """
+    def __init__(self, filename: str):
+        super().__init__()
+        self.filename = filename
+        self.masks = bytearray()
+
+    def read(self):
+        mask = super().read()
+        self.masks.append(mask)
+        return mask
+
+    def close(self):
+        with open(self.filename, 'wb') as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(self.KEYS)))
+            file.write(self.masks)
+
+
+class ReplayInput(InputSource):
+    """ Class for replaying a recording, no keys are held once it runs out
+
+    :param str filename - path of recording to read
+    """
+    def __init__(self, filename: str):
+        super().__init__()
+        with open(filename, 'rb') as file:
+            data = file.read()
+
+        magic, version, n_keys = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC or version != self.VERSION or n_keys != len(self.KEYS):
+            raise ValueError(f'{filename} is not a compatible input recording')
+        self.masks = data[self.HEADER.size:]
+
+    def __len__(self):
+        return len(self.masks)
+
+    @property
+    def finished(self):
+        """ Method to check if every recorded tick has been replayed """
+        return self.ticks >= len(self.masks)
+
+    def read(self):
+        return self.masks[self.ticks] if self.ticks < len(self.masks) else 0
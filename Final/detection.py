@@ -0,0 +1,74 @@
+""" Module for detecting targets for every enemy in one pass """
+
+import numpy as np
+
+from sprites.physics_world import PhysicsWorld
+
+
+def round_half_away(values: np.ndarray):
+    """ Function for rounding like pygame does when a float is assigned to a rect
+    :param np.ndarray values - values to round
+    """
+    return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(int)
+
+
+class TargetDetector:
+    """ Class for testing every enemy detection box against every target at once
+
+    Boxes are centered on each enemy's physics world position and level with its feet, then
+    overlap with each target rect is computed as an array operation. Only enemies whose mode
+    changed are visited. The boxes of the last detection are kept for drawing.
+
+    :param PhysicsWorld world - world the enemies are simulated in
+    """
+    def __init__(self, world: PhysicsWorld):
+        self.world = world
+
+        self.members = []
+        self.bodies = np.zeros(0, dtype=int)
+        self.sizes = np.zeros((0, 2), dtype=int)
+        self.detected = np.zeros(0, dtype=bool)
+
+        # (x, y, w, h) detection box of every member
+        self.boxes = np.zeros((0, 4), dtype=int)
+
+    def detect(self, enemies: list, targets: list):
+        """ Method for setting every enemy's mode and target
+        :param list enemies - enemies to run detection for
+        :param list targets - sprites enemies can detect, earlier targets take priority
+        """
+        # a killed enemy can be replaced without the count changing
+        if enemies != self.members:
+            self.members = list(enemies)
+            self.bodies = np.array([enemy.body for enemy in self.members], dtype=int)
+            self.sizes = np.array([enemy.detection_box.size for enemy in self.members], dtype=int)
+            self.detected = np.array(
+                [enemy.mode == enemy.Mode.TARGET for enemy in self.members], dtype=bool
+            )
+
+        # detection boxes centered on enemy and level with its feet
+        pos = self.world.pos[self.bodies]
+        width, height = self.sizes[:, 0], self.sizes[:, 1]
+        left = round_half_away(pos[:, 0]) - width//2
+        bottom = round_half_away(pos[:, 1])
+        right, top = left + width, bottom - height
+        self.boxes = np.stack((left, top, width, height), axis=1)
+
+        # first target overlapping each box, -1 if none
+        rects = np.array([target.rect for target in targets], dtype=int).reshape(-1, 4)
+        hits = (left[:, None] < rects[:, 0] + rects[:, 2]) & \
+            (top[:, None] < rects[:, 1] + rects[:, 3]) & \
+            (right[:, None] > rects[:, 0]) & \
+            (bottom[:, None] > rects[:, 1])
+        detected = hits.any(axis=1)
+        first = np.where(detected, hits.argmax(axis=1), -1)
+
+        for i in np.flatnonzero(detected | self.detected):
+            enemy = self.members[i]
+            if detected[i]:
+                enemy.target = targets[first[i]]
+                enemy.mode = enemy.Mode.TARGET
+            else:
+                enemy.mode = enemy.Mode.NORMAL
+
+        self.detected = detected
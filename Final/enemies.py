@@ -2,28 +2,51 @@
 
 from enum import Enum
 from os import path
+from typing import NamedTuple
 
 import pygame as pg
 
 from sprites.character import Character
-from sprites.spritesheet import SpriteSheet, Animation
+from sprites.spritesheet import Animation
+from sprites.animation_bank import AnimationBank
+from sprites.atlas import SheetFrames
+from sprites.state_machine import StateMachine, Transition
 from base_screen import BaseScreen
+from lod import LodScheduler
+from navigation import NavGraph
 from constants import (
     Colors,
-    Window,
+    Lod,
     Spritesheet as SP,
     MeleeEnemy as ME,
     ShooterEnemy as SE
 )
 
 
+class EnemyProps(NamedTuple):
+    """ Properties shared by every instance of an enemy class """
+    max_speed: float
+    max_fall_speed: float
+    deceleration: float
+    acc: float
+    max_dist: float
+    detection_box: tuple[int, int, int, int]
+    jump: float = 0
+    shoot_cooldown: int = 0
+
+
 class Enemy(Character):
     """ Class for handling common enemy properties
     :param tuple[float, float] pos - (x, y) spawn position of enemy
-    :param dict[str, float] props - properties of enemy sprite
+    :param EnemyProps props - properties of enemy sprite
     :param BaseScreen screen - instance of screen class for sprite groups
     :param groups - sprite groups to add sprite to
     """
+    __slots__ = (
+        'screen', 'platforms', 'grid', 'target', 'start', 'mode', 'detection_box', 'tier',
+        'steering', 'patrol', 'link'
+    )
+
     class Mode(Enum):
         """ Specify enemy current mode """
         NORMAL = 1
@@ -32,18 +55,27 @@ class Enemy(Character):
     def __init__(
             self,
             pos:tuple[float, float],
-            props:dict[str, float],
+            props:EnemyProps,
             screen:BaseScreen,
-            det:pg.Rect,
             *groups
     ):
-        super().__init__(pos, props, groups)
+        super().__init__(pos, props, groups, world=screen.physics)
+        self.screen = screen
         self.platforms = screen.platforms
+        self.grid = screen.grid
         self.target = screen.player
 
         self.start = self.pos.x
         self.mode = self.Mode.NORMAL
-        self.detection_box = det
+        self.detection_box = pg.Rect(props.detection_box)
+
+        # level of detail
+        self.tier = LodScheduler.Tier.NEAR
+        self.steering = 0
+        self.patrol = None
+
+        # navigation link being followed
+        self.link = None
 
     def reset_path(self):
         """ Method for resetting enemy path """
@@ -51,119 +83,226 @@ class Enemy(Character):
         self.start = self.pos.x
         self.direction = 1 if self.direction == -1 else -1
 
-    def detect_target(self):
-        """ Method for handling detection box """
-        self.detection_box.centerx = self.pos.x
-        self.detection_box.bottom = self.rect.bottom
+    def thinks(self):
+        """ Method for checking if targeting decisions run this tick, mid-range enemies are
+        staggered so only a share of them think on any tick
+        """
+        if self.tier == LodScheduler.Tier.NEAR:
+            return True
+        return (self.screen.ticks + self.body) % Lod.MID_INTERVAL.value == 0
 
-        if pg.Rect.colliderect(self.detection_box, self.target.rect):
-            self.mode = self.Mode.TARGET
+    def set_tier(self, tier: LodScheduler.Tier):
+        """ Method for changing level of detail, only idle grounded patrollers go dormant
+        :param LodScheduler.Tier tier - new tier
+        """
+        if tier == LodScheduler.Tier.DORMANT and \
+                (self.mode != self.Mode.NORMAL or self.vel.y != 0):
+            tier = LodScheduler.Tier.MID
+
+        if tier == LodScheduler.Tier.DORMANT:
+            self.sleep()
+        elif self.tier == LodScheduler.Tier.DORMANT:
+            self.wake()
+
+        self.tier = tier
+
+    def sleep(self):
+        """ Method for removing enemy from simulation and recording its patrol """
+        half = self.rect.width/2
+        if self.direction == 1:
+            lo, hi = self.start, self.start + self.props.max_dist
         else:
-            self.mode = self.Mode.NORMAL
+            lo, hi = self.start - self.props.max_dist, self.start
+
+        # patrol is cut short by platform edges and world bounds
+        lo = max(lo, self.world.bounds.left + half)
+        hi = min(hi, self.world.bounds.right - half)
+        platform = self.grid.collide_any(self)
+        if platform is not None:
+            lo = max(lo, platform.rect.left + half)
+            hi = min(hi, platform.rect.right - half)
+
+        self.patrol = (lo, max(hi, lo), self.screen.ticks)
+        self.world.active[self.body] = False
+        self.vel.x = 0
+
+    def wake(self):
+        """ Method for returning enemy to simulation where its patrol would have taken it """
+        lo, hi, since = self.patrol
+        span = hi - lo
+
+        if span > 0:
+            # position along a back-and-forth loop of length 2*span
+            x = min(max(self.pos.x, lo), hi)
+            phase = x - lo if self.direction == 1 else 2*span - (x - lo)
+            phase = (phase + self.max_speed*(self.screen.ticks - since)) % (2*span)
+
+            if phase < span:
+                self.pos.x = lo + phase
+                self.direction = 1
+            else:
+                self.pos.x = hi - (phase - span)
+                self.direction = -1
+
+        self.start = lo if self.direction == 1 else hi
+        self.world.prev_pos[self.body] = self.world.pos[self.body]
+        self.world.active[self.body] = True
+        self.rect.midbottom = self.pos
+        self.patrol = None
 
     def move(self):
-        """ Method for moving enemy """
+        """ Method for moving enemy, patrols are walked every tick while steering toward a target
+        is repeated, relative to the way the enemy faces, on ticks it does not think
+        """
+        if self.mode == self.Mode.NORMAL or self.thinks():
+            self.steer()
+            self.steering = self.direction*self.acc.x
+        else:
+            self.acc.x = self.direction*self.steering
+
+    def steer(self):
+        """ Method for choosing enemy acceleration """
         if self.mode == self.Mode.NORMAL:
+            self.link = None
             travelled = abs(self.pos.x - self.start)
 
-            if travelled < self.props.get('md'):
-                self.acc.x = self.direction*self.props.get('acc')
+            if travelled < self.props.max_dist:
+                self.acc.x = self.direction*self.props.acc
             else:
                 self.reset_path()
 
+    def animate(self):
+        """ Method for updating enemy image """
+        self.step_state()
+        self.update_image(self.direction == -1)
+
     def update(self):
         """ Method for updating enemy """
+        if self.tier == LodScheduler.Tier.DORMANT:
+            return
+
         super().update()
-        self.detect_target()
 
-        # restrict out-of-screen movement
-        if (self.direction == -1 and self.rect.left < 0) or \
-            (self.direction == 1 and self.rect.right > Window.WIDTH.value):
+        # restrict out-of-world movement
+        if (self.direction == -1 and self.rect.left < self.world.bounds.left) or \
+            (self.direction == 1 and self.rect.right > self.world.bounds.right):
             self.reset_path()
 
-        # restrict off-platform movement
-        platform = pg.sprite.spritecollideany(self, self.platforms)
-        if platform is not None:
+        # restrict off-platform movement unless a route leads off the platform
+        platform = self.grid.collide_any(self)
+        if platform is not None and self.link is None:
             if (self.direction == 1 and self.rect.right > platform.rect.right) or \
                 (self.direction == -1 and self.rect.left < platform.rect.left):
                 self.reset_path()
 
+        self.animate()
+
 
 class MeleeEnemy(Enemy):
     """ Class for handling melee enemy
     :param str img - filename for spritesheet
     :param tuple[float, float] pos - (x, y) spawn position of enemy
     :param screen - screen enemy is spawned on
-    :param groups - sprite groups enemy belongs to
+    :param EnemyProps props - properties to use instead of the class defaults
     """
-    def __init__(self, img:str, pos:tuple[float, float], screen:BaseScreen):
-        props = {
-            'ms': ME.MAX_SPEED.value,
-            'mf': ME.MAX_FALL_SPEED.value,
-            'dec': ME.DECELERATION.value,
-            'md': ME.MAX_DIST.value,
-            'acc': ME.ACC.value
-        }
+    __slots__ = ('nav',)
+
+    PROPS = EnemyProps(
+        max_speed=ME.MAX_SPEED.value,
+        max_fall_speed=ME.MAX_FALL_SPEED.value,
+        deceleration=ME.DECELERATION.value,
+        acc=ME.ACC.value,
+        max_dist=ME.MAX_DIST.value,
+        detection_box=ME.DETECTION_BOX.value,
+        jump=ME.JUMP.value
+    )
+
+    FRAMES = {
+        'walk': [(8, 94, 46, 74), (65, 94, 50, 72), (127, 93, 37, 73), (172, 93, 39, 75),
+                 (219, 94, 42, 74), (274, 93, 41, 75), (320, 93, 49, 75)],
+        'attack': [(6, 176, 46, 80), (56, 172, 52, 84), (138, 260, 63, 75), (207, 262, 39, 73)],
+        'death': [(85, 331, 53, 47), (153, 354, 72, 32), (234, 367, 74, 26),
+                  (313, 374, 80, 19)]
+    }
+
+    FRAME_SETTINGS = {
+        'walk': { 'duration': 0.15, 'mode': Animation.PlayMode.LOOP },
+        'attack': { 'duration': 0.25, 'mode': Animation.PlayMode.NORMAL },
+        'death': { 'duration': 0.2, 'mode': Animation.PlayMode.NORMAL }
+    }
+
+    MACHINE = StateMachine(
+        {'walk': [], 'attack': [], 'death': []},
+        on_finish={'attack': [Transition('walk')]}
+    )
 
+    def __init__(
+            self, img:str, pos:tuple[float, float], screen:BaseScreen, props:EnemyProps = None
+    ):
         super().__init__(
             pos,
-            props,
+            self.PROPS if props is None else props,
             screen,
-            pg.Rect(*ME.DETECTION_BOX.value),
             screen.all_sprites, screen.enemies
         )
 
+        self.nav = screen.nav
+
         self.load(img)
-        self.screen = screen
         self.image = self.active_anim.get_frame(0)
         self.rect = self.image.get_rect()
-        self.mask = pg.mask.from_surface(self.image)
+        self.mask = self.active_anim.masks[0]
+
+    @classmethod
+    def sheet(cls, img_dir: str):
+        """ Method for getting the spritesheet frame table of melee enemies
+        :param str img_dir - image directory for enemy spritesheet
+        """
+        return SheetFrames(
+            path.join(img_dir, SP.MELEE_ENEMY_SPRITESHEET.value), cls.FRAMES,
+            Colors.DARK_BLUE.value
+        )
 
     def load(self, img:str):
         """ Method for extracting frames from spritesheet
         :param str img - path of spritesheet
         """
-        sp_path = path.join(img, SP.MELEE_ENEMY_SPRITESHEET.value)
-        spritesheet = SpriteSheet(sp_path, Colors.DARK_BLUE.value)
-
-        frames = {
-            'walk': [(8, 94, 46, 74), (65, 94, 50, 72), (127, 93, 37, 73), (172, 93, 39, 75),
-                     (219, 94, 42, 74), (274, 93, 41, 75), (320, 93, 49, 75)],
-            'attack': [(6, 176, 46, 80), (56, 172, 52, 84), (138, 260, 63, 75), (207, 262, 39, 73)],
-            'death': [(85, 331, 53, 47), (153, 354, 72, 32), (234, 367, 74, 26),
-                      (313, 374, 80, 19)]
-        }
-
-        frame_settings = {
-            'walk': { 'duration': 0.15, 'mode': Animation.PlayMode.LOOP },
-            'attack': { 'duration': 0.25, 'mode': Animation.PlayMode.NORMAL },
-            'death': { 'duration': 0.2, 'mode': Animation.PlayMode.NORMAL }
-        }
-
-        for key, val in frames.items():
-            anim = spritesheet.get_anim(val, frame_settings[key])
-            self.store_animation(key, anim)
-
-    def animate(self):
-        """ Method for controlling active animations """
-        if self.active_name == "attack":
-            if self.is_animation_finished():
-                self.set_active_animation('walk')
+        sheet = self.sheet(img)
+        anims = AnimationBank.get_animations(
+            sheet.filename, sheet.frames, self.FRAME_SETTINGS, sheet.bg
+        )
 
-        self.update_image(self.direction == -1)
-        self.mask = pg.mask.from_surface(self.image)
+        for key, anim in anims.items():
+            self.store_animation(key, anim)
 
-    def move(self):
+    def steer(self):
         """ Method for melee enemy movement """
-        super().move()
+        super().steer()
         if self.mode == self.Mode.TARGET:
-            self.direction = 1 if self.target.rect.centerx > self.rect.centerx else -1
-            self.acc.x = self.direction*ME.ACC.value
+            self.chase()
+
+    def chase(self):
+        """ Method for steering toward target, along a route when it is on another platform """
+        grounded = self.vel.y == 0
+        if grounded:
+            self.link = self.nav.next_link(
+                self.nav.locate(self), self.nav.located.get(self.target)
+            )
+
+        # head for the link takeoff, then for its landing once airborne
+        if self.link is None:
+            goal = self.target.rect.centerx
+        else:
+            goal = self.link.takeoff if grounded else self.link.landing
 
-    def update(self):
-        """ Method for updating enemy sprite """
-        super().update()
-        self.animate()
+        self.direction = 1 if goal > self.rect.centerx else -1
+        self.acc.x = self.direction*self.props.acc
+
+        # jump at the takeoff only when already moving toward the landing
+        if grounded and self.link is not None and self.link.move == NavGraph.Move.JUMP and \
+                abs(self.link.takeoff - self.pos.x) <= self.max_speed and \
+                (self.link.landing - self.link.takeoff)*self.vel.x > 0:
+            self.vel.y = self.props.jump
 
 
 class ShooterEnemy(Enemy):
@@ -171,78 +310,103 @@ class ShooterEnemy(Enemy):
     :param str img - filename for spritesheet
     :param tuple[float, float] pos - (x, y) spawn position of enemy
     :param screen - screen enemy is spawned on
+    :param EnemyProps props - properties to use instead of the class defaults
     """
-    def __init__(self, img:str, pos: tuple[float, float], screen: BaseScreen):
-        props = {
-            'ms': SE.MAX_SPEED.value, 
-            'mf': SE.MAX_FALL_SPEED.value, 
-            'dec': SE.DECELERATION.value,
-            'md': SE.MAX_DIST.value,
-            'acc': SE.ACC.value
-        }
+    __slots__ = ('projectiles', 'next_shot')
+
+    PROPS = EnemyProps(
+        max_speed=SE.MAX_SPEED.value,
+        max_fall_speed=SE.MAX_FALL_SPEED.value,
+        deceleration=SE.DECELERATION.value,
+        acc=SE.ACC.value,
+        max_dist=SE.MAX_DIST.value,
+        detection_box=SE.DETECTION_BOX.value,
+        shoot_cooldown=SE.SHOOT_COOLDOWN.value
+    )
+
+    FRAMES = {
+        'walk': [(1, 89, 44, 70), (51, 87, 45, 72), (102, 85, 43, 74), (148, 85, 40, 74),
+                 (195, 86, 37, 73), (236, 88, 37, 71), (279, 89, 46, 68), (329, 90, 45, 69),
+                 (378, 87, 43, 72), (424, 87, 40, 72), (469, 88, 37, 71), (513, 89, 36, 70)],
+        'shoot': [(2, 170, 36, 70), (41, 167, 49, 73), (96, 170, 56, 70), (159, 167, 84, 73),
+                  (246, 167, 49, 73), (301, 170, 56, 70), (364, 170, 36, 70)],
+        'attack': [(1, 318, 37, 72), (41, 320, 50, 70), (97, 325, 66, 65), (165, 320, 50, 70),
+                  (223, 318, 37, 72)],
+        'death': [(399, 482, 72, 51), (484, 494, 67, 41), (562, 531, 72, 28)]
+    }
+
+    FRAME_SETTINGS = {
+        'walk': { 'duration': 0.15, 'mode': Animation.PlayMode.LOOP },
+        'shoot': { 'duration': 0.15, 'mode': Animation.PlayMode.NORMAL },
+        'attack': { 'duration': 0.3, 'mode': Animation.PlayMode.NORMAL },
+        'death': { 'duration': 0.2, 'mode': Animation.PlayMode.NORMAL }
+    }
+
+    MACHINE = StateMachine(
+        {'walk': [], 'shoot': [], 'attack': [], 'death': []},
+        on_finish={'shoot': [Transition('walk')], 'attack': [Transition('walk')]}
+    )
+    SHOOT = MACHINE.ids['shoot']
+
+    def __init__(
+            self, img:str, pos: tuple[float, float], screen: BaseScreen, props: EnemyProps = None
+    ):
         super().__init__(
             pos,
-            props,
+            self.PROPS if props is None else props,
             screen,
-            pg.Rect(*SE.DETECTION_BOX.value),
             screen.all_sprites, screen.enemies
         )
-        self.screen = screen
+        self.projectiles = screen.projectiles
+
+        # tick the next shot can be fired on
+        self.next_shot = 0
 
         self.load(img)
         self.image = self.active_anim.get_frame(0)
         self.rect = self.image.get_rect()
-        self.mask = pg.mask.from_surface(self.image)
+        self.mask = self.active_anim.masks[0]
+
+    @classmethod
+    def sheet(cls, img_dir: str):
+        """ Method for getting the spritesheet frame table of shooter enemies
+        :param str img_dir - image directory for enemy spritesheet
+        """
+        return SheetFrames(
+            path.join(img_dir, SP.SHOOTER_ENEMY_SPRITESHEET.value), cls.FRAMES,
+            Colors.MAGENTA.value
+        )
 
     def load(self, img:str):
         """ Method for extracting frames from spritesheet """
-        sp_path = path.join(img, SP.SHOOTER_ENEMY_SPRITESHEET.value)
-        spritesheet = SpriteSheet(sp_path, Colors.MAGENTA.value)
-
-        frames = {
-            'walk': [(1, 89, 44, 70), (51, 87, 45, 72), (102, 85, 43, 74), (148, 85, 40, 74),
-                     (195, 86, 37, 73), (236, 88, 37, 71), (279, 89, 46, 68), (329, 90, 45, 69),
-                     (378, 87, 43, 72), (424, 87, 40, 72), (469, 88, 37, 71), (513, 89, 36, 70)],
-            'shoot': [(2, 170, 36, 70), (41, 167, 49, 73), (96, 170, 56, 70), (159, 167, 84, 73),
-                      (246, 167, 49, 73), (301, 170, 56, 70), (364, 170, 36, 70)],
-            'attack': [(1, 318, 37, 72), (41, 320, 50, 70), (97, 325, 66, 65), (165, 320, 50, 70),
-                      (223, 318, 37, 72)],
-            'death': [(399, 482, 72, 51), (484, 494, 67, 41), (562, 531, 72, 28)]
-        }
-
-        frame_settings = {
-            'walk': { 'duration': 0.15, 'mode': Animation.PlayMode.LOOP },
-            'shoot': { 'duration': 0.15, 'mode': Animation.PlayMode.NORMAL },
-            'attack': { 'duration': 0.3, 'mode': Animation.PlayMode.NORMAL },
-            'death': { 'duration': 0.2, 'mode': Animation.PlayMode.NORMAL }
-        }
-
-        for key, val in frames.items():
-            anim = spritesheet.get_anim(val, frame_settings[key])
+        sheet = self.sheet(img)
+        anims = AnimationBank.get_animations(
+            sheet.filename, sheet.frames, self.FRAME_SETTINGS, sheet.bg
+        )
+
+        for key, anim in anims.items():
             self.store_animation(key, anim)
 
         self.set_active_animation("walk")
 
-    def animate(self):
-        """ Method for controlling active animations """
-        if self.active_name == "attack":
-            if self.is_animation_finished():
-                self.set_active_animation("walk")
-
-        if self.active_name == "shoot":
-            if self.is_animation_finished():
-                self.set_active_animation("walk")
-
-        self.update_image(self.direction == -1)
-        self.mask = pg.mask.from_surface(self.image)
-
-    def move(self):
+    def steer(self):
         """ Method for controlling shooter motion """
-        super().move()
+        super().steer()
         if self.mode == self.Mode.TARGET:
-            pass
+            # stand and face target while shooting
+            self.direction = 1 if self.target.rect.centerx > self.rect.centerx else -1
+            self.acc.x = 0
 
-    def update(self):
-        """ Method for updating shooter enemy sprite """
-        super().update()
-        self.animate()
+            if self.screen.ticks >= self.next_shot:
+                self.shoot()
+
+    def shoot(self):
+        """ Method for firing a bullet from the front of the enemy """
+        bullet = self.projectiles.fire(
+            self.rect.centerx + self.direction*self.rect.width/2,
+            self.rect.top + self.rect.height/3,
+            self.direction
+        )
+        if bullet is not None:
+            self.set_state(self.SHOOT)
+            self.next_shot = self.screen.ticks + self.props.shoot_cooldown
@@ -10,12 +10,15 @@ class Game(BaseGame):
     :param str title - title of window
     :param int width - pixel width of window
     :param int height - pixel height of window
+    :param bool headless - run without a visible window or frame cap
     """
-    def __init__(self, title: str, width: int, height: int):
-        super().__init__(title, width, height)
+    def __init__(self, title: str, width: int, height: int, headless: bool = False):
+        super().__init__(title, width, height, headless)
 
         self.assets_dir = path.join(self.dir, 'assets')     # locate assets directory
         self.img_dir = path.join(self.assets_dir, 'img')	# locate img directory
         self.map_dir = path.join(self.assets_dir, 'map')    # locate map directory
+        self.cache_dir = path.join(self.assets_dir, 'cache')    # compiled level directory
 
         self.debug_mode = True
+        self.dirty_rendering = False    # only redraw areas that changed
@@ -0,0 +1,71 @@
+""" Module for pre-rendering heads-up display layers """
+
+from os import path
+
+import pygame as pg
+
+from assets import ImageBank
+from constants import Health, Colors
+
+
+class HealthBar:
+    """ Class for caching composed player health bar surfaces
+
+    The outline is loaded and scaled once; a composed bar is rendered once per quantized
+    fill level and reused afterwards.
+
+    :param str img_dir - image directory for health bar outline
+    :param int steps - number of fill levels the bar is quantized to
+    """
+    def __init__(self, img_dir: str, steps: int = 100):
+        image = ImageBank.get_image(path.join(img_dir, Health.PLAYER_BAR.value))
+        self.outline = pg.transform.scale(
+            image, (Health.PLAYER_BAR_WIDTH.value, Health.PLAYER_BAR_HEIGHT.value)
+        )
+        self.outline.set_colorkey(Colors.BLACK.value)
+
+        self.steps = steps
+        self.cache = {}
+        self.level = None
+
+    def quantize(self, pct: float):
+        """ Method for converting a health factor to a cached fill level
+        :param float pct - remaining health factor
+        """
+        return max(0, min(self.steps, round(pct*self.steps)))
+
+    def get_surface(self, level: int):
+        """ Method for getting the composed bar for a fill level
+        :param int level - quantized fill level
+        """
+        surface = self.cache.get(level)
+        if surface is None:
+            pct = level/self.steps
+            surface = self.outline.copy()
+
+            fill = pct*(Health.PLAYER_BAR_WIDTH.value - 42)
+            fill_rect = pg.Rect(42, 35, fill, Health.PLAYER_BAR_HEIGHT.value/4)
+
+            if pct > 0.3:
+                color = Colors.LIGHT_ORANGE.value
+            else:
+                color = Colors.RED.value
+
+            pg.draw.rect(surface, color, fill_rect)
+            self.cache[level] = surface
+
+        return surface
+
+    def draw(self, surface: pg.Surface, pos: tuple[float, float], pct: float, redraw: bool = True):
+        """ Method for blitting the bar, returns the blitted rect or None if skipped
+        :param pg.Surface surface - surface to draw bar on
+        :param tuple[float, float] pos - (x, y) top left of bar
+        :param float pct - remaining health factor
+        :param bool redraw - blit even if the fill level has not changed
+        """
+        level = self.quantize(pct)
+        if not redraw and level == self.level:
+            return None
+
+        self.level = level
+        return surface.blit(self.get_surface(level), pos)
@@ -4,68 +4,309 @@ from os import path
 
 import pygame as pg
 
-from map import TiledMap
+from map import TiledMap, MapObject
+from level_compiler import CompiledLevel, cache_path, load_level, read_level
+from camera import Camera
+from lod import LodScheduler
+from detection import TargetDetector
+from navigation import NavGraph
+from projectiles import BulletPool
 from game import Game
 from base_screen import BaseScreen
+from sprites.animation_bank import AnimationBank
+from sprites.atlas import TextureAtlas
+from assets import AssetLoader
 from other_sprites import Platform
 from player import Player
 from enemies import MeleeEnemy, ShooterEnemy
-from constants import Colors, Health, PLT_COL_TOL
+from constants import Colors, Health, Spritesheet as SP, PLT_COL_TOL
+
+# character classes whose frames are packed into the texture atlas
+CHARACTERS = (Player, MeleeEnemy, ShooterEnemy)
 
 
 class Level(BaseScreen):
     """ Class for managing level 1 of game
 
     :param Game game - instance of main game window
+    :param list[MapObject] objects - spawn objects to use instead of a level source
+    :param str source - .tmx or text map to load through the level cache, the tiled map
+        of level 1 when None
+    :param dict props - EnemyProps by spawn name ('melee', 'shooter') to use instead of the
+        class defaults
+    :param CompiledLevel compiled - level already loaded from its source
     """
-    def __init__(self, game: Game):
+    def __init__(
+            self, game: Game, objects: list[MapObject] = None, source: str = None,
+            props: dict = None, compiled: CompiledLevel = None
+    ):
         super().__init__(game)
+        self.props = {} if props is None else props
+
+        if objects is None:
+            if compiled is None:
+                if source is None:
+                    source = self.default_source(self.game)
+                compiled = load_level(source, self.game.cache_dir)
+            self.map = TiledMap(compiled)
+            objects = compiled.objects
+            size = (compiled.width, compiled.height)
+        else:
+            self.map = None
+            size = (
+                max([self.game.width] + [obj.x + obj.width for obj in objects]),
+                max([self.game.height] + [obj.y + obj.height for obj in objects])
+            )
+
+        # world bounds are independent of the window
+        self.physics.bounds.size = size
+        self.camera = Camera(self.game.width, self.game.height, self.physics.bounds)
+        self.lod = LodScheduler(self.physics)
+
+        # sprites enemies can detect
+        self.detector = TargetDetector(self.physics)
+        self.targets = []
+
+        # bullets fired by shooters
+        self.projectiles = BulletPool(self.game.img_dir, self.physics.bounds, self.bullets)
+
+        # routes between platforms for chasing enemies
+        props = self.props.get('melee', MeleeEnemy.PROPS)
+        self.nav = NavGraph(
+            self.grid, self.physics.bounds, props.max_speed, props.jump, props.max_fall_speed
+        )
+
+        # simulation phases run in order every tick, timed by the profiler
+        self.phases = {
+            'input': self.game.controls.poll,
+            'lod': self.assign_tiers,
+            'physics': self.physics.step,
+            'sprites': self.all_sprites.update,
+            'projectiles': self.projectiles.update,
+            'detection': self.detect_targets,
+            'collisions': self.check_collisions
+        }
+
+        # dirty rendering state
+        self.background = None
+        self.background_view = None
+        self.drawn_rects = []
+        self.hud_rect = None
+
+        # character frames are cut from one cached atlas
+        AnimationBank.load_atlas(
+            [cls.sheet(self.game.img_dir) for cls in CHARACTERS], self.game.cache_dir
+        )
 
-        self.map = TiledMap(path.join(self.game.map_dir, 'level.tmx'))
+        self.spawn(objects)
 
-        # extract map contents
-        for obj in self.map.tmx_data.objects:
+    @staticmethod
+    def default_source(game: Game):
+        """ Method for getting the tiled map of level 1
+        :param Game game - instance of main game window
+        """
+        return path.join(game.map_dir, 'level.tmx')
+
+    @classmethod
+    def preload(cls, game: Game, loader: AssetLoader, source: str = None):
+        """ Method for loading the level source, character atlas and images on the loader's
+        threads, returns a dict the compiled level is put in under 'level' once finished
+
+        Cached levels and atlases are only read on the threads, ones that are missing or
+        stale are built when the loader is polled.
+
+        :param Game game - instance of main game window
+        :param AssetLoader loader - loader to submit jobs to
+        :param str source - .tmx or text map, the tiled map of level 1 when None
+        """
+        if source is None:
+            source = cls.default_source(game)
+        sheets = [character.sheet(game.img_dir) for character in CHARACTERS]
+        loaded = {}
+
+        def finish_level(level):
+            loaded['level'] = load_level(source, game.cache_dir) if level is None else level
+
+        def finish_atlas(data):
+            if data is None:
+                AnimationBank.load_atlas(sheets, game.cache_dir)
+            else:
+                image, index = data
+                AnimationBank.use_atlas(TextureAtlas(image.convert_alpha(), index))
+
+        loader.submit(
+            read_level, cache_path(source, game.cache_dir), source, finish=finish_level
+        )
+        loader.submit(
+            lambda: TextureAtlas.read(*TextureAtlas.cache_files(sheets, game.cache_dir)),
+            finish=finish_atlas
+        )
+        loader.load_image(path.join(game.img_dir, SP.BULLET.value))
+        loader.load_image(path.join(game.img_dir, Health.PLAYER_BAR.value))
+        return loaded
+
+    def spawn(self, objects: list[MapObject]):
+        """ Method for creating sprites from map objects
+        :param list[MapObject] objects - named rectangles of platforms and spawn points
+        """
+        for obj in objects:
             obj_midbottom = pg.math.Vector2(obj.x + obj.width/2, obj.y + obj.height)
             if obj.name == 'player':
-                self.player = Player(self.game.img_dir, obj_midbottom, self.all_sprites)
+                self.player = Player(
+                    self.game.img_dir, obj_midbottom, self.all_sprites, world=self.physics,
+                    controls=self.game.controls
+                )
+                self.targets.append(self.player)
             elif obj.name == 'platform':
                 Platform((obj.x, obj.y), (obj.width, obj.height), self.platforms, self.all_sprites)
             elif obj.name == 'melee':
-                MeleeEnemy(self.game.img_dir, (obj.x, obj.y), self)
+                MeleeEnemy(self.game.img_dir, (obj.x, obj.y), self, self.props.get('melee'))
             elif obj.name == 'shooter':
-                ShooterEnemy(self.game.img_dir, (obj.x, obj.y), self)
+                ShooterEnemy(self.game.img_dir, (obj.x, obj.y), self, self.props.get('shooter'))
 
-    def draw(self):
-        self.game.surface.fill(Colors.WHITE.value)
-        self.all_sprites.draw(self.game.surface)
+        # platforms never move so they are indexed once
+        self.grid.build_static(self.platforms)
+        self.nav.build(self.platforms)
+
+    def draw_static(self, surface: pg.Surface):
+        """ Method for drawing the map and platforms inside the camera viewport
+        :param pg.Surface surface - surface to draw on
+        """
+        surface.fill(Colors.WHITE.value)
+        if self.map is not None:
+            self.map.render(surface, self.camera.rect)
 
+        surface.blits([
+            (plt.image, self.camera.apply(plt.rect)) for plt in self.grid.query(self.camera.rect)
+        ], False)
+
+    def place_characters(self):
+        """ Method for listing characters inside the camera viewport with the screen rects they
+        are drawn at, returns the image blits and the detection box outlines of debug mode
+        """
+        blits = [
+            (sp.image, self.camera.apply(sp.rect)) for sp in self.physics.bodies
+            if sp is not None and self.camera.visible(sp.rect)
+        ]
+        blits.extend(
+            (bullet.image, self.camera.apply(bullet.rect)) for bullet in self.bullets
+            if self.camera.visible(bullet.rect)
+        )
+
+        # detection boxes are drawn where the last detection placed them
+        boxes = []
         if self.game.debug_mode:
-            for enemy in self.enemies.sprites():
-                if hasattr(enemy, 'detection_box'):
-                    pg.draw.rect(self.game.surface, Colors.CYAN.value, enemy.detection_box, 1)
+            for box in map(pg.Rect, self.detector.boxes.tolist()):
+                if self.camera.visible(box):
+                    boxes.append(self.camera.apply(box))
+
+        return blits, boxes
+
+    def draw_characters(self, surface: pg.Surface, placed: tuple = None):
+        """ Method for drawing characters inside the camera viewport, returns drawn rects
+        :param pg.Surface surface - surface to draw on
+        :param tuple placed - blits and boxes from place_characters, placed here when None
+        """
+        blits, boxes = self.place_characters() if placed is None else placed
+        rects = surface.blits(blits)
+        rects.extend(pg.draw.rect(surface, Colors.CYAN.value, box, 1) for box in boxes)
+        return rects
+
+    def draw(self):
+        self.camera.follow(self.player.rect)
+
+        if self.game.dirty_rendering:
+            return self.draw_dirty()
+
+        surface = self.game.surface
+        self.profiler.time('static', self.draw_static, surface)
+        self.profiler.time('characters', self.draw_characters, surface)
+
+        pct = self.player.health/Health.PLAYER_HEALTH.value
+        self.profiler.time('health_bar', self.draw_player_health_bar, 120, 20, pct)
+        return None
+
+    def draw_dirty(self):
+        """ Method for redrawing only moving sprites over a pre-rendered static background,
+        returns the list of changed rects
+        """
+        surface = self.game.surface
+        dirty = []
 
-        self.draw_player_health_bar(120, 20, self.player.health/Health.PLAYER_HEALTH.value)
+        # static layer is rendered once per camera position and shown in full
+        if self.background_view != self.camera.rect.topleft:
+            if self.background is None:
+                self.background = pg.Surface(surface.get_size()).convert()
+            self.profiler.time('static', self.draw_static, self.background)
+            self.background_view = self.camera.rect.topleft
 
-        pg.display.flip()
+            surface.blit(self.background, (0, 0))
+            dirty.append(surface.get_rect())
+            self.drawn_rects = []
+            self.hud_rect = None
+
+        # erase everything drawn last frame
+        surface.blits([(self.background, rect, rect) for rect in self.drawn_rects], False)
+        dirty.extend(self.drawn_rects)
+
+        # hud is redrawn when its fill changes or anything is erased or drawn over it, and
+        # is erased before sprites are drawn so they stay beneath it and its translucent bar
+        # is never blended over the last one
+        placed = self.place_characters()
+        pct = self.player.health/Health.PLAYER_HEALTH.value
+        redraw_hud = self.hud_rect is None or \
+            self.health_bar.quantize(pct) != self.health_bar.level or \
+            self.hud_rect.collidelist(self.drawn_rects) != -1 or \
+            self.hud_rect.collidelist([rect for _, rect in placed[0]] + placed[1]) != -1
+        if redraw_hud and self.hud_rect is not None:
+            surface.blit(self.background, self.hud_rect, self.hud_rect)
+
+        self.drawn_rects = self.profiler.time(
+            'characters', self.draw_characters, surface, placed
+        )
+        dirty.extend(self.drawn_rects)
+
+        rect = self.profiler.time(
+            'health_bar', self.draw_player_health_bar, 120, 20, pct, redraw_hud
+        )
+        if rect is not None:
+            self.hud_rect = rect
+            dirty.append(rect)
+
+        return dirty
 
     def update(self):
-        self.all_sprites.update()
-        self.check_collisions()
+        for name, phase in self.phases.items():
+            self.profiler.time(name, phase)
+
+    def assign_tiers(self):
+        """ Method for scheduling enemies and finding where their targets stand """
+        self.lod.assign(self.enemies.sprites(), self.player)
+        for target in self.targets:
+            self.nav.locate(target)
+
+    def detect_targets(self):
+        """ Method for switching enemies between patrolling and targeting """
+        self.detector.detect(self.enemies.sprites(), self.targets)
 
     def check_collisions(self):
         """ Check collisions present in level """
         # PLAYER COLLISIONS
         # collision with platforms
-        hits = pg.sprite.spritecollide(self.player, self.platforms, False, pg.sprite.collide_mask)
+        hits = self.grid.collide(self.player, pg.sprite.collide_mask)
         for hit in hits:
             self.handle_collision(self.player, hit, PLT_COL_TOL)
 
         # ENEMY COLLISIONS
         # collision with platforms
-        hits = pg.sprite.groupcollide(
-            self.enemies, self.platforms, False, False, pg.sprite.collide_mask
+        awake = (
+            enemy for enemy in self.enemies if enemy.tier != LodScheduler.Tier.DORMANT
         )
+        hits = self.grid.groupcollide(awake, pg.sprite.collide_mask)
 
         for sp, hit_list in hits.items():
             for hit in hit_list:
                 self.handle_collision(sp, hit, PLT_COL_TOL)
+
+        # BULLET COLLISIONS
+        self.projectiles.collide(self.grid, self.targets)
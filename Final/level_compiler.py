@@ -0,0 +1,240 @@
+""" Module for compiling level sources into cached binary levels """
+
+import argparse
+import hashlib
+import os
+import re
+import tempfile
+import zipfile
+from os import path
+from typing import NamedTuple
+
+import numpy as np
+import pygame as pg
+
+from map import MapObject
+from constants import TILESIZE
+
+
+class CompiledLevel(NamedTuple):
+    """ Platforms, spawn points and tile layers of a level ready to be spawned and drawn """
+    width: int
+    height: int
+    tile_width: int
+    tile_height: int
+    objects: list[MapObject]
+    layers: np.ndarray
+    tiles: np.ndarray
+
+
+# bump when the cache layout or compiled output changes so old caches are rebuilt
+CACHE_VERSION = 3
+
+# text map tiles
+PLATFORM_RUN = re.compile('1+')
+SPAWN_TILE = re.compile('[PMS]')
+SPAWNS = {'P': 'player', 'M': 'melee', 'S': 'shooter'}
+
+
+def compile_tmx(filename: str):
+    """ Function for compiling a tiled map, the display must be initialized for tile images
+    :param str filename - path of .tmx file
+    """
+    from pytmx.util_pygame import load_pygame
+
+    tmx_data = load_pygame(filename)
+    tw, th = tmx_data.tilewidth, tmx_data.tileheight
+
+    objects = [
+        MapObject(obj.name, obj.x, obj.y, obj.width, obj.height) for obj in tmx_data.objects
+    ]
+    layers = np.array(
+        [tmx_data.layers[i].data for i in tmx_data.visible_tile_layers], dtype=np.int32
+    ).reshape(-1, tmx_data.height, tmx_data.width)
+
+    # tile images indexed by gid as RGBA pixels, gid 0 is empty
+    tiles = np.zeros((len(tmx_data.images), th, tw, 4), dtype=np.uint8)
+    for gid, image in enumerate(tmx_data.images):
+        if image is None:
+            continue
+        if image.get_size() != (tw, th):
+            raise ValueError(f'{filename} has tiles that are not {tw}x{th}')
+        # per-pixel alpha so colorkeys and opaque surfaces keep their transparency
+        pixels = pg.image.tobytes(image.convert_alpha(), 'RGBA')
+        tiles[gid] = np.frombuffer(pixels, np.uint8).reshape(th, tw, 4)
+
+    return CompiledLevel(
+        tmx_data.width*tw, tmx_data.height*th, tw, th, objects, layers, tiles
+    )
+
+
+def compile_ascii(filename: str):
+    """ Function for compiling a text map where every character is a tile
+
+    The file is read one row at a time. Each run of platform tiles in a row becomes one
+    platform rectangle a tile high, and spawn tiles become spawn objects with the player first.
+    Runs are not merged across rows, collisions resolve against the top and bottom of a
+    platform by half its height, so a tall platform would pull characters at its sides onto it.
+
+    :param str filename - path of text file
+    """
+    spawns = []
+    platforms = []
+
+    rows, columns = 0, 0
+    with open(filename, encoding='utf-8') as file:
+        for y, row in enumerate(file):
+            row = row.rstrip('\r\n')
+            rows, columns = y + 1, max(columns, len(row))
+
+            for match in PLATFORM_RUN.finditer(row):
+                platforms.append(MapObject(
+                    'platform', match.start()*TILESIZE, y*TILESIZE,
+                    (match.end() - match.start())*TILESIZE, TILESIZE
+                ))
+
+            for match in SPAWN_TILE.finditer(row):
+                spawns.append(MapObject(
+                    SPAWNS[match.group()], match.start()*TILESIZE, y*TILESIZE, TILESIZE, TILESIZE
+                ))
+
+    # enemies target the player on creation
+    objects = [obj for obj in spawns if obj.name == 'player']
+    objects.extend(platforms)
+    objects.extend(obj for obj in spawns if obj.name != 'player')
+
+    return CompiledLevel(
+        columns*TILESIZE, rows*TILESIZE, TILESIZE, TILESIZE, objects,
+        np.zeros((0, rows, columns), dtype=np.int32),
+        np.zeros((0, TILESIZE, TILESIZE, 4), dtype=np.uint8)
+    )
+
+
+def compile_level(filename: str):
+    """ Function for compiling a .tmx file, or a text map for any other extension
+    :param str filename - path of level source
+    """
+    if filename.endswith('.tmx'):
+        return compile_tmx(filename)
+    return compile_ascii(filename)
+
+
+def source_hash(filename: str):
+    """ Function for hashing the contents of a level source
+    :param str filename - path of level source
+    """
+    with open(filename, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def save_level(level: CompiledLevel, filename: str, source: str):
+    """ Function for writing a compiled level and the stamp of its source to a .npz file
+    :param CompiledLevel level - level to write
+    :param str filename - path of cache file
+    :param str source - path of level source
+    """
+    stat = os.stat(source)
+    names = sorted({obj.name for obj in level.objects})
+
+    # written beside the cache and swapped in, so readers never see half a file
+    directory = path.dirname(filename) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.savez(
+                file,
+                version=CACHE_VERSION,
+                stamp=np.array([stat.st_mtime_ns, stat.st_size], dtype=np.int64),
+                hash=source_hash(source),
+                size=np.array([level.width, level.height, level.tile_width, level.tile_height]),
+                names=np.array(names, dtype=str),
+                kinds=np.array([names.index(obj.name) for obj in level.objects], dtype=np.int32),
+                rects=np.array([obj[1:] for obj in level.objects], dtype=float).reshape(-1, 4),
+                layers=level.layers,
+                tiles=level.tiles
+            )
+        os.replace(temp, filename)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def is_fresh(data, source: str):
+    """ Function for checking if a cache was compiled from the current level source, the
+    source is only hashed when its modification time or size changed
+    :param data - loaded .npz cache file
+    :param str source - path of level source
+    """
+    if int(data['version']) != CACHE_VERSION:
+        return False
+
+    stat = os.stat(source)
+    if data['stamp'].tolist() == [stat.st_mtime_ns, stat.st_size]:
+        return True
+    return str(data['hash']) == source_hash(source)
+
+
+def read_level(filename: str, source: str):
+    """ Function for reading a compiled level from a .npz file, returns None when the file is
+    missing, unreadable or older than its source
+    :param str filename - path of cache file
+    :param str source - path of level source
+    """
+    if not path.exists(filename):
+        return None
+
+    try:
+        with np.load(filename) as data:
+            if not is_fresh(data, source):
+                return None
+
+            width, height, tw, th = data['size'].tolist()
+            names = data['names'].tolist()
+            objects = [
+                MapObject(names[kind], *rect)
+                for kind, rect in zip(data['kinds'].tolist(), data['rects'].tolist())
+            ]
+            return CompiledLevel(width, height, tw, th, objects, data['layers'], data['tiles'])
+    except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def cache_path(source: str, cache_dir: str = None):
+    """ Function for getting the cache file of a level source
+    :param str source - path of level source
+    :param str cache_dir - directory of cache files, next to the source when None
+    """
+    if cache_dir is None:
+        cache_dir = path.dirname(source)
+    return path.join(cache_dir, path.basename(source) + '.npz')
+
+
+def load_level(source: str, cache_dir: str = None):
+    """ Function for loading a level from its cache, compiling and caching it when stale
+    :param str source - path of level source
+    :param str cache_dir - directory of cache files, next to the source when None
+    """
+    filename = cache_path(source, cache_dir)
+    level = read_level(filename, source)
+    if level is None:
+        level = compile_level(source)
+        save_level(level, filename, source)
+    return level
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile level sources into cached levels')
+    parser.add_argument('sources', nargs='+', help='.tmx or text map files')
+    parser.add_argument('--cache-dir', help='directory to write cache files to')
+    args = parser.parse_args()
+
+    # tile images are converted for the display format
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pg.init()
+    pg.display.set_mode((1, 1))
+
+    for src in args.sources:
+        out = cache_path(src, args.cache_dir)
+        save_level(compile_level(src), out, src)
+        print(f'{src} -> {out}')
@@ -0,0 +1,53 @@
+""" Module for showing progress while assets load """
+
+import pygame as pg
+
+from assets import AssetLoader
+from base_screen import BaseScreen
+from constants import Colors, Loading
+
+
+class LoadingScreen(BaseScreen):
+    """ Class for drawing a progress bar until a loader has finished, then switching to the
+    screen the assets were loaded for
+
+    :param Game game - instance of main game window
+    :param AssetLoader loader - loader with every job already submitted
+    :param make_screen - function creating the next screen once every job has finished
+    """
+    def __init__(self, game, loader: AssetLoader, make_screen):
+        super().__init__(game)
+        self.loader = loader
+        self.make_screen = make_screen
+        self.font = pg.font.Font(None, Loading.FONT_SIZE.value)
+
+        # finishing jobs can block, so the bar is shown before any are finished
+        self.drawn = False
+
+    def update(self):
+        if not self.drawn:
+            return
+
+        self.loader.poll()
+        if self.loader.done and self.game.next_screen is None:
+            self.loader.close()
+
+            # shown by the game once the loop of this screen returns
+            self.game.next_screen = self.make_screen()
+
+    def draw(self):
+        surface = self.game.surface
+        surface.fill(Colors.BLACK.value)
+
+        bar = pg.Rect(0, 0, Loading.BAR_WIDTH.value, Loading.BAR_HEIGHT.value)
+        bar.center = surface.get_rect().center
+        fill = bar.inflate(-4, -4)
+        fill.width = round(fill.width*self.loader.progress)
+
+        pg.draw.rect(surface, Colors.WHITE.value, bar, 2)
+        pg.draw.rect(surface, Colors.WHITE.value, fill)
+
+        text = self.font.render('Loading', True, Colors.WHITE.value)
+        surface.blit(text, text.get_rect(midbottom=(bar.centerx, bar.top - 10)))
+        self.drawn = True
+        return None
@@ -0,0 +1,60 @@
+""" Module for scheduling enemy simulation level of detail """
+
+from enum import Enum
+
+import numpy as np
+
+from sprites.physics_world import PhysicsWorld
+from constants import Lod
+
+
+class LodScheduler:
+    """ Class for assigning enemies a simulation tier from their distance to the player
+
+    Distances are computed for every enemy in one array operation; only enemies whose tier
+    changed are visited.
+
+    :param PhysicsWorld world - world the enemies and target are simulated in
+    :param float near - distance under which enemies update every tick
+    :param float dormant - distance over which idle enemies stop simulating
+    """
+    class Tier(Enum):
+        """ Specify how often an enemy is simulated """
+        NEAR = 1
+        MID = 2
+        DORMANT = 3
+
+    def __init__(
+            self, world: PhysicsWorld, near: float = Lod.NEAR_DIST.value,
+            dormant: float = Lod.DORMANT_DIST.value
+    ):
+        self.world = world
+        self.near = near
+        self.dormant = dormant
+
+        self.members = []
+        self.bodies = np.zeros(0, dtype=int)
+        self.tiers = np.zeros(0, dtype=int)
+
+    def assign(self, enemies: list, target):
+        """ Method for updating the tier of every enemy
+        :param list enemies - enemies to schedule
+        :param target - physics sprite distances are measured to
+        """
+        # enemies can die and spawn in the same tick, so members are compared not counted
+        if enemies != self.members:
+            self.members = list(enemies)
+            self.bodies = np.array([enemy.body for enemy in self.members], dtype=int)
+            self.tiers = np.array([enemy.tier.value for enemy in self.members], dtype=int)
+
+        offset = self.world.pos[self.bodies] - self.world.pos[target.body]
+        dist = np.hypot(offset[:, 0], offset[:, 1])
+        tiers = np.where(
+            dist < self.near, self.Tier.NEAR.value,
+            np.where(dist < self.dormant, self.Tier.MID.value, self.Tier.DORMANT.value)
+        )
+
+        for i in np.flatnonzero(tiers != self.tiers):
+            enemy = self.members[i]
+            enemy.set_tier(self.Tier(tiers[i]))
+            self.tiers[i] = enemy.tier.value
@@ -1,21 +1,63 @@
 """ Module for launching game and setting screen """
 
+import argparse
+
 from game import Game
+from assets import AssetLoader
+from loading import LoadingScreen
+from controls import RecordingInput, ReplayInput
 from constants import Window
 from level import Level
 
 class Launcher(Game):
-    """ Class for launching game and starting level """
-    def __init__(self):
-        super().__init__(Window.TITLE.value, Window.WIDTH.value, Window.HEIGHT.value)
+    """ Class for launching game and starting level
+
+    :param bool headless - run without a visible window or frame cap
+    """
+    def __init__(self, headless: bool = False):
+        super().__init__(Window.TITLE.value, Window.WIDTH.value, Window.HEIGHT.value, headless)
         self.fps = Window.FPS.value   # set game FPS
 
     def start(self):
-        """ Method for starting game to level screen """
+        """ Method for starting game to level screen once its assets are loaded """
+        loader = AssetLoader()
+        loaded = Level.preload(self, loader)
+        self.set_screen(
+            LoadingScreen(self, loader, lambda: Level(self, compiled=loaded['level']))
+        )
+
+    def simulate(self, n_ticks: int):
+        """ Method for running level for a fixed number of ticks without the game loop
+        :param int n_ticks - number of ticks to simulate
+        """
         lvl = Level(self)
-        self.set_screen(lvl)
+        self.screen = lvl
+        lvl.step(n_ticks)
+        return lvl
 
 
 if __name__ == '__main__':
-    launcher = Launcher()
-    launcher.start()
+    parser = argparse.ArgumentParser(description=Window.TITLE.value)
+    parser.add_argument('--headless', action='store_true', help='run without a window')
+    parser.add_argument('--ticks', type=int, help='simulate a number of ticks and exit')
+    parser.add_argument('--profile', help='.csv or .json file to write phase timings to on exit')
+    parser.add_argument('--record', help='file to record key state of every tick to')
+    parser.add_argument('--replay', help='recorded file to play key state from')
+    args = parser.parse_args()
+
+    launcher = Launcher(args.headless)
+    launcher.profile_path = args.profile
+    if args.record is not None:
+        launcher.controls = RecordingInput(args.record)
+    elif args.replay is not None:
+        launcher.controls = ReplayInput(args.replay)
+
+        # headless replays run exactly as long as the recording
+        if args.headless and args.ticks is None:
+            args.ticks = len(launcher.controls)
+
+    if args.ticks is not None:
+        launcher.simulate(args.ticks)
+        launcher.quit()
+    else:
+        launcher.start()
@@ -1,27 +1,126 @@
 """ Module for intiializing tiled map """
 
+from typing import NamedTuple
+
 import pygame as pg
-from pytmx.util_pygame import load_pygame
+
+from constants import CHUNK_SIZE
+
+
+class MapObject(NamedTuple):
+    """ Named spawn rectangle used to build levels without a tiled map """
+    name: str
+    x: float
+    y: float
+    width: float
+    height: float
 
 
 class TiledMap:
     """ Class for controlling tiled map contents
 
-    :param str filename - filename of tiledmap
+    Tile layers are baked into fixed-size chunk surfaces on first use and cached, so a
+    frame only blits the chunks that intersect the viewport. Tile images are made from the
+    compiled pixels the first time they are drawn.
+
+    :param CompiledLevel level - compiled level with tile layers and tile pixels
+    :param int chunk_size - pixel width and height of a cached chunk
     """
-    def __init__(self, filename: str):
-        self.tmx_data = load_pygame(filename)
-        self.width = self.tmx_data.width*self.tmx_data.tilewidth
-        self.height = self.tmx_data.height*self.tmx_data.tileheight
-
-    def render(self, surface):
-        """ Method for rendering data layers present on tiled map """
-        for layer in self.tmx_data.visible_layers:
-            if hasattr(layer, 'data'):
-                for x, y, gid in layer:
-                    tile = self.tmx_data.get_tile_image_by_gid(gid)
-                    if tile:
-                        surface.blit(tile, (x*self.tmx_data.tilewidth, y*self.tmx_data.tileheight))
+    def __init__(self, level, chunk_size: int = CHUNK_SIZE):
+        self.width = level.width
+        self.height = level.height
+        self.tile_width = level.tile_width
+        self.tile_height = level.tile_height
+
+        self.layers = level.layers
+        self.tiles = level.tiles
+        self.images = {}
+
+        self.chunk_size = chunk_size
+        self.chunks = {}
+
+    def get_tile_image(self, gid: int):
+        """ Method for getting the image of a tile, converted on first use
+        :param int gid - global id of tile
+        """
+        if gid not in self.images:
+            size = (self.tile_width, self.tile_height)
+            image = pg.image.frombytes(self.tiles[gid].tobytes(), size, 'RGBA')
+            self.images[gid] = image.convert_alpha()
+        return self.images[gid]
+
+    def chunk_key(self, x: int, y: int):
+        """ Method for getting the key of the chunk containing a tile
+        :param int x - tile column
+        :param int y - tile row
+        """
+        return (x*self.tile_width//self.chunk_size, y*self.tile_height//self.chunk_size)
+
+    def bake_chunk(self, key: tuple[int, int]):
+        """ Method for rendering the tiles of one chunk, returns None if it has no tiles
+        :param tuple[int, int] key - (column, row) of chunk
+        """
+        tw, th = self.tile_width, self.tile_height
+        left, top = key[0]*self.chunk_size, key[1]*self.chunk_size
+        width = min(self.chunk_size, self.width - left)
+        height = min(self.chunk_size, self.height - top)
+
+        columns = slice(left//tw, (left + width - 1)//tw + 1)
+        rows = slice(top//th, (top + height - 1)//th + 1)
+
+        chunk = None
+        for layer in self.layers:
+            block = layer[rows, columns]
+            for y, x in zip(*block.nonzero()):
+                if chunk is None:
+                    chunk = pg.Surface((width, height), pg.SRCALPHA).convert_alpha()
+                tile = self.get_tile_image(block[y, x])
+                chunk.blit(tile, ((columns.start + x)*tw - left, (rows.start + y)*th - top))
+
+        return chunk
+
+    def get_chunk(self, key: tuple[int, int]):
+        """ Method for getting a cached chunk, baking it on first use
+        :param tuple[int, int] key - (column, row) of chunk
+        """
+        if key not in self.chunks:
+            self.chunks[key] = self.bake_chunk(key)
+        return self.chunks[key]
+
+    def invalidate(self, x: int, y: int):
+        """ Method for discarding the cached chunk containing a tile
+        :param int x - tile column
+        :param int y - tile row
+        """
+        self.chunks.pop(self.chunk_key(x, y), None)
+
+    def set_tile(self, x: int, y: int, layer: int, gid: int):
+        """ Method for changing a tile and re-baking only its chunk
+        :param int x - tile column
+        :param int y - tile row
+        :param int layer - index of tile layer
+        :param int gid - global id of new tile
+        """
+        self.layers[layer][y, x] = gid
+        self.invalidate(x, y)
+
+    def render(self, surface: pg.Surface, viewport: pg.Rect = None):
+        """ Method for rendering the chunks of tile layers that intersect a viewport
+        :param pg.Surface surface - surface to draw on, its top left is the viewport top left
+        :param pg.Rect viewport - area of map to draw, the whole map when None
+        """
+        if viewport is None:
+            viewport = pg.Rect(0, 0, self.width, self.height)
+
+        cs = self.chunk_size
+        rows = range(max(viewport.top, 0)//cs, (min(viewport.bottom, self.height) - 1)//cs + 1)
+        columns = range(max(viewport.left, 0)//cs, (min(viewport.right, self.width) - 1)//cs + 1)
+
+        for cy in rows:
+            for cx in columns:
+                chunk = self.get_chunk((cx, cy))
+                if chunk is not None:
+                    surface.blit(chunk, (cx*cs - viewport.x, cy*cs - viewport.y))
 
     def make_map(self):
         """ Method for making surface from map """
@@ -0,0 +1,273 @@
+""" Module for planning enemy routes across platforms """
+
+from enum import Enum
+from heapq import heappush, heappop
+from math import ceil, hypot
+from typing import NamedTuple
+
+import pygame as pg
+
+from spatial_hash import SpatialHash
+from constants import GRAVITY, PLT_COL_TOL, TILESIZE
+
+
+class Segment(NamedTuple):
+    """ Walkable top of a platform """
+    left: int
+    right: int
+    top: int
+
+    @property
+    def center(self):
+        """ Method to get x-position of middle of segment """
+        return (self.left + self.right)/2
+
+
+class Link(NamedTuple):
+    """ Airborne move from one segment to another """
+    move: 'NavGraph.Move'
+    src: int
+    dst: int
+    takeoff: float
+    landing: float
+    cost: float
+
+
+class NavGraph:
+    """ Class for finding routes between the platforms a character can walk on
+
+    Every platform top is a segment. Segments are linked by drops off their edges and by
+    jumps, both tested against the tick by tick trajectory a mover with the given limits
+    follows under GRAVITY. Only segments the grid finds within jumping or falling reach of a
+    segment are tested, so building scales with level size. The graph is built once per
+    level, and A* routes between pairs of segments are cached, so following a route is a
+    dictionary lookup per tick.
+
+    :param SpatialHash grid - broadphase holding the platforms
+    :param pg.Rect bounds - area the mover is kept inside
+    :param float max_speed - horizontal speed of the mover
+    :param float jump - vertical velocity the mover jumps with
+    :param float max_fall_speed - fall speed cap of the mover
+    :param int clearance - distance from a platform edge the mover's center needs to clear it
+    """
+    class Move(Enum):
+        """ Specify how a link is travelled """
+        DROP = 1
+        JUMP = 2
+
+    def __init__(
+            self, grid: SpatialHash, bounds: pg.Rect, max_speed: float, jump: float,
+            max_fall_speed: float, clearance: int = TILESIZE
+    ):
+        self.grid = grid
+        self.bounds = bounds
+        self.max_speed = max_speed
+        self.jump = jump
+        self.max_fall_speed = max_fall_speed
+        self.clearance = clearance
+
+        # trajectory ticks by height, platforms share a handful of heights
+        self.fall_cache = {}
+        self.jump_cache = {}
+
+        self.segments = []
+        self.platform_segments = {}
+        self.links = []
+        self.routes = {}
+        self.located = {}
+
+    def fall_ticks(self, dy: float):
+        """ Method for counting ticks a mover starting at rest takes to fall a distance
+        :param float dy - distance to fall
+        """
+        if dy not in self.fall_cache:
+            y, vy, ticks = 0, 0, 0
+            while y < dy:
+                vy = min(vy + GRAVITY, self.max_fall_speed)
+                y += vy
+                ticks += 1
+            self.fall_cache[dy] = ticks
+        return self.fall_cache[dy]
+
+    def jump_ticks(self, dy: float):
+        """ Method for counting ticks a jumping mover takes to come down to a height, returns
+        None if the jump never gets that high
+        :param float dy - height above takeoff to land at, negative to land below it
+        """
+        if dy not in self.jump_cache:
+            self.jump_cache[dy] = self.trace_jump(dy)
+        return self.jump_cache[dy]
+
+    def trace_jump(self, dy: float):
+        """ Method for stepping a jump until it comes down to a height, see jump_ticks
+        :param float dy - height above takeoff to land at, negative to land below it
+        """
+        y, vy, ticks = 0, self.jump, 0
+        while True:
+            vy += GRAVITY
+            if vy > 0:
+                vy = min(vy, self.max_fall_speed)
+                if y > -dy:
+                    return None
+            y += vy
+            ticks += 1
+
+            if vy > 0 and y >= -dy:
+                return ticks
+
+    def apex(self):
+        """ Method for getting the height of a jump """
+        y, vy = 0, self.jump
+        while vy + GRAVITY < 0:
+            vy += GRAVITY
+            y += vy
+        return -y
+
+    def nearby(self, area: pg.Rect):
+        """ Method for getting the indices of segments whose platforms overlap an area
+        :param pg.Rect area - area to search
+        """
+        return [self.platform_segments[p] for p in self.grid.query(area)]
+
+    def blocked(self, a: Segment, b: Segment, x: float, below: list):
+        """ Method for checking if a segment between two heights spans an x-position
+        :param Segment a - upper segment
+        :param Segment b - lower segment
+        :param float x - x-position of the fall
+        :param list below - indices of segments that could be in the way
+        """
+        return any(
+            a.top < seg.top < b.top and seg.left <= x <= seg.right
+            for seg in (self.segments[k] for k in below)
+        )
+
+    def add_link(self, move: Move, src: int, dst: int, takeoff: float, landing: float):
+        """ Method for adding a link, cost is walking and flying distance between centers
+        :param Move move - how link is travelled
+        :param int src - index of segment left
+        :param int dst - index of segment reached
+        :param float takeoff - x-position link leaves src at
+        :param float landing - x-position link reaches dst at
+        """
+        a, b = self.segments[src], self.segments[dst]
+        cost = abs(a.center - takeoff) + hypot(landing - takeoff, b.top - a.top) + \
+            abs(landing - b.center)
+        self.links[src].append(Link(move, src, dst, takeoff, landing, cost))
+
+    def build(self, platforms):
+        """ Method for building segments and links from platforms
+        :param platforms - iterable of platform sprites
+        """
+        platforms = list(platforms)
+        self.segments = [Segment(p.rect.left, p.rect.right, p.rect.top) for p in platforms]
+        self.platform_segments = {p: i for i, p in enumerate(platforms)}
+        self.links = [[] for _ in self.segments]
+        self.routes.clear()
+        self.located.clear()
+
+        c = self.clearance
+        inside = range(self.bounds.left + c, self.bounds.right - c + 1)
+        apex = ceil(self.apex())
+        jump_reach = int(self.max_speed*self.jump_ticks(0)) + 2*c
+
+        # a drop can be as deep as the world, and drifts furthest when it is
+        depth = self.bounds.height
+        drop_reach = int(self.max_speed*self.fall_ticks(depth)) + 2*c
+
+        for i, a in enumerate(self.segments):
+            width = a.right - a.left
+
+            # walk off either edge and drift onto a lower segment
+            area = pg.Rect(a.left - drop_reach, a.top + 1, width + 2*drop_reach, depth)
+            below = [j for j in self.nearby(area) if self.segments[j].top > a.top]
+            for j in below:
+                b = self.segments[j]
+                reach = self.max_speed*self.fall_ticks(b.top - a.top)
+                for takeoff in (a.left - c, a.right + c):
+                    if takeoff not in inside:
+                        continue
+                    landing = min(max(takeoff, b.left + c), b.right - c)
+                    if abs(landing - takeoff) <= reach and \
+                            not self.blocked(a, b, landing, below):
+                        self.add_link(self.Move.DROP, i, j, takeoff, landing)
+
+            # jump from outside either end of a higher segment and land on that end
+            area = pg.Rect(a.left - jump_reach, a.top - apex, width + 2*jump_reach, apex + 1)
+            for j in self.nearby(area):
+                b = self.segments[j]
+                if j == i or b.top > a.top:
+                    continue
+
+                ticks = self.jump_ticks(a.top - b.top)
+                if ticks is None:
+                    continue
+                reach = self.max_speed*ticks
+                for takeoff, landing in (
+                        (max(b.right + c, a.left), b.right - c),
+                        (min(b.left - c, a.right), b.left + c)
+                ):
+                    if a.left <= takeoff <= a.right and abs(landing - takeoff) <= reach:
+                        self.add_link(self.Move.JUMP, i, j, takeoff, landing)
+
+    def route(self, src: int, dst: int):
+        """ Method for getting the cached tuple of links from one segment to another, empty
+        when they are the same segment and None when there is no route
+        :param int src - index of start segment
+        :param int dst - index of goal segment
+        """
+        key = (src, dst)
+        if key not in self.routes:
+            self.routes[key] = self.search(src, dst)
+        return self.routes[key]
+
+    def search(self, src: int, dst: int):
+        """ Method for finding the cheapest route between segments with A*
+        :param int src - index of start segment
+        :param int dst - index of goal segment
+        """
+        goal = self.segments[dst]
+
+        def estimate(i):
+            seg = self.segments[i]
+            return hypot(seg.center - goal.center, seg.top - goal.top)
+
+        costs = {src: 0}
+        came_from = {src: None}
+        frontier = [(estimate(src), src)]
+        while frontier:
+            _, i = heappop(frontier)
+            if i == dst:
+                links = []
+                while came_from[i] is not None:
+                    links.append(came_from[i])
+                    i = came_from[i].src
+                return tuple(reversed(links))
+
+            for link in self.links[i]:
+                cost = costs[i] + link.cost
+                if cost < costs.get(link.dst, float('inf')):
+                    costs[link.dst] = cost
+                    came_from[link.dst] = link
+                    heappush(frontier, (cost + estimate(link.dst), link.dst))
+
+        return None
+
+    def next_link(self, src: int, dst: int):
+        """ Method for getting the first link of the route between segments, or None
+        :param int src - index of start segment
+        :param int dst - index of goal segment
+        """
+        if src is None or dst is None:
+            return None
+        links = self.route(src, dst)
+        return links[0] if links else None
+
+    def locate(self, sprite):
+        """ Method for getting the segment a sprite stands on, the last one it stood on
+        while it is in the air
+        :param sprite - sprite with a rect
+        """
+        platform = self.grid.collide_any(sprite)
+        if platform is not None and abs(platform.rect.top - sprite.rect.bottom) < PLT_COL_TOL:
+            self.located[sprite] = self.platform_segments.get(platform)
+        return self.located.get(sprite)
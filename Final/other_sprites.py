@@ -13,6 +13,8 @@ class Platform(BaseSprite):
     :param size[float, float] size: (width, height) of platform
     :param groups - groups sprite belongs to
     """
+    __slots__ = ()
+
     def __init__(self, pos: tuple[float, float], size: tuple[float, float], *groups):
         super().__init__(groups)
         self.image = pg.Surface(size)
@@ -0,0 +1,113 @@
+""" Module for timing game loop phases """
+
+import csv
+import json
+from collections import deque
+from time import perf_counter_ns
+
+import numpy as np
+import pygame as pg
+
+from constants import Colors, Profile
+
+
+class Profiler:
+    """ Class for timing named phases and keeping rolling percentiles of their durations
+
+    Each phase keeps its most recent durations in nanoseconds. Percentiles are only
+    computed when the overlay is refreshed or a report is requested.
+
+    :param int window - number of recent samples kept per phase
+    """
+    def __init__(self, window: int = Profile.WINDOW.value):
+        self.window = window
+        self.enabled = True
+        self.samples = {}
+
+        # overlay is re-rendered every few frames
+        self.font = None
+        self.overlay = None
+        self.frames = 0
+
+    def record(self, name: str, ns: int):
+        """ Method for adding a duration to a phase
+        :param str name - name of phase
+        :param int ns - duration in nanoseconds
+        """
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.window)
+        self.samples[name].append(ns)
+
+    def time(self, name: str, func, *args):
+        """ Method for calling a function and recording its duration, returns its result
+        :param str name - name of phase
+        :param func - function to call
+        :param args - arguments to call function with
+        """
+        if not self.enabled:
+            return func(*args)
+
+        start = perf_counter_ns()
+        result = func(*args)
+        self.record(name, perf_counter_ns() - start)
+        return result
+
+    def report(self):
+        """ Method for getting count, mean, p50, p95, p99 and max milliseconds of each phase """
+        report = {}
+        for name, samples in self.samples.items():
+            ms = np.fromiter(samples, dtype=float, count=len(samples))/1e6
+            p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+            report[name] = {
+                'count': len(ms),
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(ms.max())
+            }
+        return report
+
+    def dump(self, filename: str):
+        """ Method for writing the report to a .csv file, or a .json file for any other name
+        :param str filename - path of file to write
+        """
+        report = self.report()
+        with open(filename, 'w', newline='', encoding='utf-8') as file:
+            if filename.endswith('.csv'):
+                fields = ['count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+                writer = csv.writer(file)
+                writer.writerow(['phase'] + fields)
+                for name, stats in report.items():
+                    writer.writerow([name] + [stats[field] for field in fields])
+            else:
+                json.dump(report, file, indent=2)
+
+    def render_overlay(self):
+        """ Method for rendering a table of phase percentiles onto a surface """
+        if self.font is None:
+            self.font = pg.font.Font(None, Profile.FONT_SIZE.value)
+
+        rows = [('phase', 'p50', 'p95', 'p99')]
+        for name, stats in self.report().items():
+            rows.append((name, *(f'{stats[key]:.2f}' for key in ('p50_ms', 'p95_ms', 'p99_ms'))))
+
+        # columns are laid out at fixed offsets since the font is not monospaced
+        height = self.font.get_linesize()
+        width = Profile.COLUMN_WIDTH.value
+        self.overlay = pg.Surface((width*(len(rows[0]) + 1), height*len(rows)))
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                x = 0 if j == 0 else width*(j + 1)
+                self.overlay.blit(self.font.render(cell, True, Colors.GREEN.value), (x, i*height))
+
+    def draw(self, surface: pg.Surface):
+        """ Method for drawing the overlay in the top right corner, returns the blitted rect
+        :param pg.Surface surface - surface to draw on
+        """
+        if self.overlay is None or self.frames % Profile.REFRESH.value == 0:
+            self.render_overlay()
+        self.frames += 1
+
+        rect = self.overlay.get_rect(topright=(surface.get_width() - 10, 10))
+        return surface.blit(self.overlay, rect)
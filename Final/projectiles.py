@@ -0,0 +1,134 @@
+""" Module for firing and updating pooled projectiles """
+
+from os import path
+
+import numpy as np
+import pygame as pg
+
+from sprites.base_sprite import BaseSprite
+from assets import ImageBank
+from spatial_hash import SpatialHash
+from constants import (
+    BULLET_ACC, BULLET_DMG, BULLET_SPEED, BULLET_MAX_SPEED, BULLET_POOL, Spritesheet as SP
+)
+
+
+class Bullet(BaseSprite):
+    """ Class for a bullet sprite owned by a pool slot
+
+    :param pg.Surface image - image shared by every bullet
+    :param int index - slot of bullet in pool arrays
+    """
+    __slots__ = ('index',)
+
+    def __init__(self, image: pg.Surface, index: int):
+        super().__init__()
+        self.image = image
+        self.rect = image.get_rect()
+        self.index = index
+
+
+class BulletPool:
+    """ Class for reusing a fixed set of bullet sprites
+
+    Bullets are created once. Firing takes a free slot and releasing returns it, so shooting
+    allocates no sprites. Positions and velocities of every slot are kept in arrays and
+    advanced with a handful of array operations per tick; only bullets in flight have their
+    rects synced and collided.
+
+    :param str img_dir - image directory for bullet image
+    :param pg.Rect bounds - area bullets are released outside of
+    :param pg.sprite.Group group - group holding bullets in flight
+    :param int capacity - number of bullets that can be in flight at once
+    """
+    def __init__(
+            self, img_dir: str, bounds: pg.Rect, group: pg.sprite.Group,
+            capacity: int = BULLET_POOL
+    ):
+        self.bounds = bounds
+        self.group = group
+
+        image = ImageBank.get_image(path.join(img_dir, SP.BULLET.value))
+        self.images = {1: image, -1: pg.transform.flip(image, True, False)}
+        self.half = np.array(image.get_size())//2
+        self.size = np.array(image.get_size())
+
+        self.sprites = [Bullet(image, i) for i in range(capacity)]
+        self.free = list(range(capacity - 1, -1, -1))
+
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.direction = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def fire(self, x: float, y: float, direction: int):
+        """ Method for launching a bullet, returns it or None when every bullet is in flight
+        :param float x - x-position of bullet center
+        :param float y - y-position of bullet center
+        :param int direction - 1 to fire right, -1 to fire left
+        """
+        if not self.free:
+            return None
+
+        i = self.free.pop()
+        self.pos[i] = (x, y)
+        self.vel[i] = (direction*BULLET_SPEED, 0)
+        self.direction[i] = direction
+        self.active[i] = True
+
+        bullet = self.sprites[i]
+        bullet.image = self.images[direction]
+        bullet.rect.center = (x, y)
+        self.group.add(bullet)
+        return bullet
+
+    def release(self, i: int):
+        """ Method for returning a bullet to the pool
+        :param int i - slot of bullet
+        """
+        self.vel[i] = 0
+        self.direction[i] = 0
+        self.active[i] = False
+        self.free.append(i)
+        self.group.remove(self.sprites[i])
+
+    def update(self):
+        """ Method for accelerating and moving every bullet in flight """
+        # idle slots have no direction or velocity so are left in place
+        vx = self.vel[:, 0]
+        np.clip(vx + BULLET_ACC*self.direction, -BULLET_MAX_SPEED, BULLET_MAX_SPEED, out=vx)
+        self.pos += self.vel
+
+        bounds = self.bounds
+        x = self.pos[:, 0]
+        for i in np.flatnonzero(self.active & ((x < bounds.left) | (x > bounds.right))):
+            self.release(i)
+
+        flying = np.flatnonzero(self.active)
+        for i, topleft in zip(flying, (np.floor(self.pos[flying] + 0.5) - self.half).tolist()):
+            self.sprites[i].rect.topleft = topleft
+
+    def collide(self, grid: SpatialHash, targets: list):
+        """ Method for releasing bullets that hit platforms or targets, targets hit take damage
+        :param SpatialHash grid - broadphase holding the platforms
+        :param list targets - sprites bullets damage
+        """
+        flying = np.flatnonzero(self.active)
+        if len(flying) == 0:
+            return
+
+        # every bullet against every target at once
+        left, top = (np.floor(self.pos[flying] + 0.5) - self.half).T
+        right, bottom = left + self.size[0], top + self.size[1]
+        rects = np.array([target.rect for target in targets], dtype=int).reshape(-1, 4)
+        hits = (left[:, None] < rects[:, 0] + rects[:, 2]) & \
+            (top[:, None] < rects[:, 1] + rects[:, 3]) & \
+            (right[:, None] > rects[:, 0]) & \
+            (bottom[:, None] > rects[:, 1])
+
+        for row, i in enumerate(flying):
+            if hits[row].any():
+                targets[hits[row].argmax()].damage(BULLET_DMG)
+                self.release(i)
+            elif grid.collide_any(self.sprites[i]) is not None:
+                self.release(i)
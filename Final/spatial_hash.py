@@ -0,0 +1,137 @@
+""" Module for indexing sprites in a uniform grid for collision queries """
+
+from collections import defaultdict
+
+import pygame as pg
+
+from constants import CELL_SIZE
+
+
+class SpatialHash:
+    """ Class for bucketing sprite rects into fixed-size grid cells
+
+    Static cells hold sprites that never move (platforms) and are built once. Dynamic cells
+    hold moving sprites and are rebuilt every time they are queried as a group. Queries only
+    test sprites that share a cell, and results keep the order the static sprites were added
+    in so they match pygame's group collision functions.
+
+    :param int cell_size - pixel width and height of a grid cell
+    """
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.static_cells = defaultdict(list)
+        self.dynamic_cells = defaultdict(list)
+        self.order = {}
+
+    def cells(self, rect: pg.Rect):
+        """ Method for listing the keys of every cell a rect covers
+        :param pg.Rect rect - rect to find cells for
+        """
+        cs = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(rect.left//cs, (rect.right - 1)//cs + 1)
+            for cy in range(rect.top//cs, (rect.bottom - 1)//cs + 1)
+        ]
+
+    def build_static(self, sprites):
+        """ Method for indexing sprites that do not move
+        :param sprites - iterable of sprites with rects
+        """
+        self.static_cells.clear()
+        self.order.clear()
+        for sp in sprites:
+            self.order[sp] = len(self.order)
+            for key in self.cells(sp.rect):
+                self.static_cells[key].append(sp)
+
+    def rebuild_dynamic(self, sprites):
+        """ Method for re-indexing moving sprites at their current positions
+        :param sprites - iterable of sprites with rects
+        """
+        self.dynamic_cells.clear()
+        for sp in sprites:
+            for key in self.cells(sp.rect):
+                self.dynamic_cells[key].append(sp)
+
+    def query(self, rect: pg.Rect):
+        """ Method for getting static sprites whose rects overlap a rect, in insertion order
+        :param pg.Rect rect - area to search
+        """
+        found = []
+        for key in self.cells(rect):
+            for sp in self.static_cells.get(key, ()):
+                if sp not in found and rect.colliderect(sp.rect):
+                    found.append(sp)
+
+        if len(found) > 1:
+            found.sort(key=self.order.get)
+        return found
+
+    def query_dynamic(self, rect: pg.Rect):
+        """ Method for getting moving sprites whose rects overlap a rect
+        :param pg.Rect rect - area to search
+        """
+        found = []
+        for key in self.cells(rect):
+            for sp in self.dynamic_cells.get(key, ()):
+                if sp not in found and rect.colliderect(sp.rect):
+                    found.append(sp)
+        return found
+
+    def collide(self, sprite, collided=None):
+        """ Method for getting static sprites that collide with a sprite
+        :param sprite - sprite to test
+        :param collided - optional narrow phase test run on rect-overlapping pairs
+        """
+        hits = self.query(sprite.rect)
+        if collided is None:
+            return hits
+        return [hit for hit in hits if collided(sprite, hit)]
+
+    def collide_any(self, sprite):
+        """ Method for getting the first static sprite whose rect overlaps a sprite, or None
+        :param sprite - sprite to test
+        """
+        rect = sprite.rect
+        first = None
+        for key in self.cells(rect):
+            for sp in self.static_cells.get(key, ()):
+                if (first is None or self.order[sp] < self.order[first]) and \
+                        rect.colliderect(sp.rect):
+                    first = sp
+        return first
+
+    def groupcollide(self, sprites, collided=None):
+        """ Method for colliding moving sprites against static sprites
+
+        Moving sprites are re-indexed and only pairs sharing a cell are tested, returns a
+        dictionary of sprite to list of static hits like pg.sprite.groupcollide.
+
+        :param sprites - iterable of moving sprites
+        :param collided - optional narrow phase test run on rect-overlapping pairs
+        """
+        sprites = list(sprites)
+        self.rebuild_dynamic(sprites)
+
+        hits = defaultdict(list)
+        tested = set()
+        for key, movers in self.dynamic_cells.items():
+            statics = self.static_cells.get(key)
+            if not statics:
+                continue
+
+            for sp in movers:
+                for hit in statics:
+                    pair = (sp, hit)
+                    if pair in tested:
+                        continue
+                    tested.add(pair)
+
+                    if sp.rect.colliderect(hit.rect) and (collided is None or collided(sp, hit)):
+                        hits[sp].append(hit)
+
+        return {
+            sp: sorted(hits[sp], key=self.order.get)
+            for sp in sprites if sp in hits
+        }
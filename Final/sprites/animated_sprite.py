@@ -1,77 +1,106 @@
 """ Module for animated sprite base class"""
 
-import pygame as pg
-
-from constants import Window
 from .base_sprite import BaseSprite
 from .spritesheet import Animation
+from .state_machine import StateMachine
 
 
 class AnimatedSprite(BaseSprite):
     """ Class for controlling spritesheet animations in sprite
+
+    Every animation is a state of the class's MACHINE and is stored by state id, so
+    switching animations and stepping the machine compare integers rather than names.
     
     :param groups - list of sprite groups that the sprite belongs to
     """
+    __slots__ = ('tick', 'active_anim', 'state', 'animations')
+
+    MACHINE = StateMachine({})
+
     def __init__(self, *groups):
         super().__init__(groups)
 
-        # control
-        self.elapsed_time = 0
+        # control, playback tick of active animation
+        self.tick = 0
         self.active_anim = None
-        self.active_name = ""
-        self.animation_storage = {}
+        self.state = None
+        self.animations = [None]*len(self.MACHINE.names)
+
+    @property
+    def active_name(self):
+        """ Method to get name of active animation """
+        return "" if self.state is None else self.MACHINE.names[self.state]
 
     def store_animation(self, name: str, anim: Animation):
-        """ Method for storing animation object as a name in dictionary for quick access
+        """ Method for storing animation object under the id of its state for quick access
 
-        :param str name: name to be stored as key in animation dictionary
-        :param Animation anim: Animation object to be stored in dictionary
+        :param str name: name of state in the class's MACHINE
+        :param Animation anim: Animation object to be stored
         """
-        self.animation_storage[name] = anim
+        state = self.MACHINE.ids[name]
+        self.animations[state] = anim
 
         # if no animation playing, start this one
-        if self.active_name == "":
-            self.set_active_animation(name)
+        if self.state is None:
+            self.set_state(state)
 
-    def set_active_animation(self, name: str):
-        """ Method for setting active animation using name in dictionary
+    def set_state(self, state: int):
+        """ Method for setting active animation using its state id
 
-        :param str name: key in dictionary to get value from
+        :param int state: id of state in the class's MACHINE
         """
-        if name not in self.animation_storage:
-            print(f'No animation: {name}')
+        # check if this animation is already running
+        if state == self.state:
             return
 
-        # check if this animation is already running
-        if name == self.active_name:
+        anim = self.animations[state]
+        if anim is None:
+            print(f'No animation: {self.MACHINE.names[state]}')
+            return
+
+        self.state = state
+        self.active_anim = anim
+        self.tick = 0
+
+    def set_active_animation(self, name: str):
+        """ Method for setting active animation using its name
+
+        :param str name: name of state in the class's MACHINE
+        """
+        if name not in self.MACHINE.ids:
+            print(f'No animation: {name}')
             return
+        self.set_state(self.MACHINE.ids[name])
 
-        self.active_name = name
-        self.active_anim = self.animation_storage[name]
-        self.elapsed_time = 0
+    def step_state(self):
+        """ Method for taking the transitions of the active state for this tick """
+        self.MACHINE.step(self)
 
     def is_animation_finished(self):
         """ Method for checking if active animation is finished
 
         """
-        return self.active_anim.is_animation_finished(self.elapsed_time)
+        return self.active_anim.finished[self.tick]
 
     def update_image(self, flip=False):
-        """ Method for updating rect and image after applying animation
+        """ Method for updating rect, image and mask after applying animation
         :param flip - flips image if condition meant
         """
         rect = self.rect
-        self.image = self.active_anim.get_frame(self.elapsed_time)
+        index = self.active_anim.schedule[self.tick]
 
-        # flip image if necessary
+        # select pre-baked orientation
         if flip:
-            self.image = pg.transform.flip(self.image, True, False)
+            self.image = self.active_anim.flipped_frames[index]
+            self.mask = self.active_anim.flipped_masks[index]
+        else:
+            self.image = self.active_anim.frames[index]
+            self.mask = self.active_anim.masks[index]
 
         self.rect = self.image.get_rect()
         self.rect.midbottom = rect.midbottom
 
     def update(self):
-        """ Method for updating sprite and increasing elapsed time for anim """
+        """ Method for updating sprite and advancing anim by a simulation tick """
         super().update()
-        # update with time since last frame
-        self.elapsed_time += 1/Window.FPS.value
+        self.tick = self.active_anim.next_tick[self.tick]
@@ -0,0 +1,104 @@
+""" Module for sharing spritesheets and animations between sprites """
+
+from .spritesheet import SpriteSheet, Animation
+from .atlas import SheetFrames, TextureAtlas
+
+
+class AnimationBank:
+    """ Process-wide cache of spritesheets and cut animations
+
+    Spritesheets are decoded once per (filename, colorkey) and animations are cut once
+    per (filename, frame rects, scale, colorkey, duration, mode). Every sprite of the same
+    kind receives the same Animation objects, which must be treated as read-only. Once an
+    atlas is loaded, frames it holds are taken from it instead of their spritesheets.
+    """
+    _sheets: dict[tuple, SpriteSheet] = {}
+    _animations: dict[tuple, Animation] = {}
+    _atlas: TextureAtlas = None
+
+    @classmethod
+    def load_atlas(cls, sheets: list[SheetFrames], cache_dir: str):
+        """ Method for loading the texture atlas of frame tables, building it on first run
+
+        :param list[SheetFrames] sheets - frame tables packed into the atlas
+        :param str cache_dir - directory of cached atlases
+        """
+        if cls._atlas is None:
+            cls._atlas = TextureAtlas.load_or_build(sheets, cache_dir)
+        return cls._atlas
+
+    @classmethod
+    def use_atlas(cls, atlas: TextureAtlas):
+        """ Method for cutting animations from an atlas that was already loaded
+
+        :param TextureAtlas atlas - atlas to take frames from
+        """
+        cls._atlas = atlas
+
+    @classmethod
+    def get_sheet(cls, filename: str, bg: tuple[int, int, int] = None):
+        """ Method for getting a loaded spritesheet
+
+        :param str filename - spritesheet file
+        :param tuple[int, int, int] bg - RGB color of background to filter
+        """
+        key = (filename, bg)
+        sheet = cls._sheets.get(key)
+        if sheet is None:
+            sheet = SpriteSheet(filename, bg)
+            cls._sheets[key] = sheet
+        return sheet
+
+    @classmethod
+    def get_animation(
+            cls, filename: str, coords: list[tuple[float, float, float, float]],
+            settings: {'duration', 'mode'}, bg: tuple[int, int, int] = None, scale: float = None
+    ):
+        """ Method for getting a shared animation, cutting it on first request
+
+        :param str filename - spritesheet file
+        :param list coords - frame (x, y, w, h) rects of the animation
+        :param {'duration', 'mode'} settings - duration and playmode for animation
+        :param tuple[int, int, int] bg - RGB color of background to filter
+        :param float scale - scale factor to apply to each frame
+        """
+        key = (
+            filename, tuple(tuple(frame) for frame in coords), scale, bg,
+            settings['duration'], settings['mode']
+        )
+        anim = cls._animations.get(key)
+        if anim is None:
+            frames = None
+            if cls._atlas is not None:
+                frames = [cls._atlas.get_image(filename, frame, bg, scale) for frame in coords]
+            if frames is None or None in frames:
+                anim = cls.get_sheet(filename, bg).get_anim(coords, settings, scale=scale)
+            else:
+                anim = Animation(frames, settings['duration'], settings['mode'])
+            cls._animations[key] = anim
+        return anim
+
+    @classmethod
+    def get_animations(
+            cls, filename: str, frames: dict[str, list], settings: dict[str, dict],
+            bg: tuple[int, int, int] = None, scale: float = None
+    ):
+        """ Method for getting every named animation of a frame table
+
+        :param str filename - spritesheet file
+        :param dict frames - animation name to list of frame rects
+        :param dict settings - animation name to duration and playmode
+        :param tuple[int, int, int] bg - RGB color of background to filter
+        :param float scale - scale factor to apply to each frame
+        """
+        return {
+            name: cls.get_animation(filename, coords, settings[name], bg, scale)
+            for name, coords in frames.items()
+        }
+
+    @classmethod
+    def clear(cls):
+        """ Method for releasing every cached spritesheet, animation and the atlas """
+        cls._sheets.clear()
+        cls._animations.clear()
+        cls._atlas = None
@@ -0,0 +1,214 @@
+""" Module for packing animation frames into one cached texture atlas """
+
+import hashlib
+import json
+import os
+import tempfile
+from math import ceil, sqrt
+from os import path
+from typing import NamedTuple
+
+import pygame as pg
+
+from .spritesheet import SpriteSheet
+
+# bump when packing or the index layout changes so old atlases are rebuilt
+ATLAS_VERSION = 1
+
+
+class SheetFrames(NamedTuple):
+    """ Frame table of a spritesheet and how its frames are cut """
+    filename: str
+    frames: dict[str, list]
+    bg: tuple[int, int, int] = None
+    scale: float = None
+
+
+def frame_key(filename: str, frame: tuple, bg: tuple = None, scale: float = None):
+    """ Function for getting the index key of a cut frame
+    :param str filename - spritesheet file
+    :param tuple frame - (x, y, w, h) of frame on spritesheet
+    :param tuple bg - RGB color of background to filter
+    :param float scale - scale factor applied to frame
+    """
+    return f'{path.basename(filename)}|{",".join(map(str, frame))}|{bg}|{scale}'
+
+
+def write_replacing(filename: str, write):
+    """ Function for writing a file beside its destination and moving it into place, so a
+    crashed or concurrent writer never leaves a partly written file behind
+    :param str filename - path of file
+    :param write - function writing the file to the path it is given
+    """
+    # extension is kept, pygame picks the image format from it
+    directory = path.dirname(filename) or '.'
+    fd, temp = tempfile.mkstemp(suffix=path.splitext(filename)[1], dir=directory)
+    os.close(fd)
+    try:
+        write(temp)
+        os.replace(temp, filename)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def pack(sizes: list[tuple[int, int]]):
+    """ Function for placing rectangles on shelves of a near square area, returns the
+    (x, y) of each rectangle and the (width, height) of the area
+
+    :param list sizes - (width, height) of each rectangle
+    """
+    area = sum(w*h for w, h in sizes)
+    width = max([ceil(sqrt(area))] + [w for w, _ in sizes])
+
+    # tallest first so every shelf is filled by rectangles of similar height
+    positions = [None]*len(sizes)
+    x, y, shelf = 0, 0, 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+
+    return positions, (width, y + shelf)
+
+
+class TextureAtlas:
+    """ Class for cutting every animation frame from one pre-scaled image
+
+    Frames are cut from their spritesheets, scaled and given per-pixel alpha in place of
+    their colorkey once, then packed into a single image with an index of where each frame
+    landed. The image and index are cached on disk under a hash of the spritesheets and
+    frame tables, so later runs load one image and scale nothing.
+
+    :param pg.Surface image - packed frames
+    :param dict index - frame key to (x, y, w, h) rect on image
+    """
+    def __init__(self, image: pg.Surface, index: dict[str, tuple]):
+        self.image = image
+        self.index = index
+
+    @staticmethod
+    def source_hash(sheets: list[SheetFrames]):
+        """ Method for hashing spritesheet contents and how their frames are cut
+        :param list[SheetFrames] sheets - frame tables packed into the atlas
+        """
+        digest = hashlib.sha1(str(ATLAS_VERSION).encode())
+        for sheet in sheets:
+            with open(sheet.filename, 'rb') as file:
+                digest.update(file.read())
+            frames = [[tuple(frame) for frame in coords] for coords in sheet.frames.values()]
+            digest.update(repr(
+                (path.basename(sheet.filename), frames, sheet.bg, sheet.scale)
+            ).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, sheets: list[SheetFrames]):
+        """ Method for cutting and packing every frame of the frame tables
+        :param list[SheetFrames] sheets - frame tables to pack
+        """
+        images = {}
+        for sheet in sheets:
+            spritesheet = SpriteSheet(sheet.filename, sheet.bg)
+            for coords in sheet.frames.values():
+                for frame in coords:
+                    key = frame_key(sheet.filename, frame, sheet.bg, sheet.scale)
+                    if key not in images:
+                        images[key] = spritesheet.get_image(frame, sheet.scale).convert_alpha()
+
+        keys = list(images)
+        positions, size = pack([images[key].get_size() for key in keys])
+
+        image = pg.Surface(size, pg.SRCALPHA)
+        index = {}
+        for key, pos in zip(keys, positions):
+            index[key] = tuple(image.blit(images[key], pos))
+        return cls(image, index)
+
+    @classmethod
+    def cache_files(cls, sheets: list[SheetFrames], cache_dir: str):
+        """ Method for getting the (image, index) files the atlas of frame tables is cached in
+        :param list[SheetFrames] sheets - frame tables packed into the atlas
+        :param str cache_dir - directory of cached atlases
+        """
+        name = path.join(cache_dir, f'atlas-{cls.source_hash(sheets)}')
+        return name + '.png', name + '.json'
+
+    def save(self, image_file: str, index_file: str):
+        """ Method for writing the atlas image and its index
+        :param str image_file - path of .png file
+        :param str index_file - path of .json file
+        """
+        def write_index(filename):
+            with open(filename, 'w', encoding='utf-8') as file:
+                json.dump({'version': ATLAS_VERSION, 'frames': self.index}, file)
+
+        # index is written last so it never describes an image that was not written
+        os.makedirs(path.dirname(image_file) or '.', exist_ok=True)
+        write_replacing(image_file, lambda filename: pg.image.save(self.image, filename))
+        write_replacing(index_file, write_index)
+
+    @staticmethod
+    def read(image_file: str, index_file: str):
+        """ Method for decoding an atlas image and its index without converting the image,
+        returns None when either is missing, unreadable or does not match the other
+        :param str image_file - path of .png file
+        :param str index_file - path of .json file
+        """
+        if not path.exists(index_file):
+            return None
+
+        try:
+            with open(index_file, encoding='utf-8') as file:
+                data = json.load(file)
+            if data['version'] != ATLAS_VERSION:
+                return None
+            index = {key: tuple(rect) for key, rect in data['frames'].items()}
+            image = pg.image.load(image_file)
+
+            # an index from another build can point past the edge of the image
+            bounds = image.get_rect()
+            if not all(bounds.contains(rect) for rect in index.values()):
+                return None
+            return image, index
+        except (OSError, KeyError, ValueError, TypeError, AttributeError, pg.error):
+            return None
+
+    @classmethod
+    def load(cls, image_file: str, index_file: str):
+        """ Method for reading an atlas, returns None when it is missing or unreadable
+        :param str image_file - path of .png file
+        :param str index_file - path of .json file
+        """
+        data = cls.read(image_file, index_file)
+        if data is None:
+            return None
+        image, index = data
+        return cls(image.convert_alpha(), index)
+
+    @classmethod
+    def load_or_build(cls, sheets: list[SheetFrames], cache_dir: str):
+        """ Method for loading the cached atlas of the frame tables, building and caching it
+        when the spritesheets or tables changed
+        :param list[SheetFrames] sheets - frame tables packed into the atlas
+        :param str cache_dir - directory of cached atlases
+        """
+        files = cls.cache_files(sheets, cache_dir)
+        atlas = cls.load(*files)
+        if atlas is None:
+            atlas = cls.build(sheets)
+            atlas.save(*files)
+        return atlas
+
+    def get_image(self, filename: str, frame: tuple, bg: tuple = None, scale: float = None):
+        """ Method for getting a frame as a view of the atlas, None if it was not packed
+        :param str filename - spritesheet file
+        :param tuple frame - (x, y, w, h) of frame on spritesheet
+        :param tuple bg - RGB color of background to filter
+        :param float scale - scale factor applied to frame
+        """
+        rect = self.index.get(frame_key(filename, frame, bg, scale))
+        return None if rect is None else self.image.subsurface(rect)
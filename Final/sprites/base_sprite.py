@@ -8,6 +8,8 @@ class BaseSprite(pg.sprite.Sprite):
         
     :param groups: list of sprite groups that the sprite belongs to
     """
+    __slots__ = ('image', 'rect', 'mask')
+
     def __init__(self, *groups):
         super().__init__(groups)
         self.image = None
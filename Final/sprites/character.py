@@ -1,18 +1,33 @@
 """ Module for controlling character sprites """
 
-from constants import Window
+from typing import NamedTuple
+
 from .physics_sprite import PhysicsSprite
+from .physics_world import PhysicsWorld
+
+
+class CharacterProps(NamedTuple):
+    """ Movement limits shared by every instance of a character class """
+    max_speed: float
+    max_fall_speed: float
+    deceleration: float
 
 
 class Character(PhysicsSprite):
     """ Character class for shared properties of player and enemy sprites
 
     :param tuple[float, float] pos - (x, y) position of character position
-    :param props - properties for max speed, max fall speed, deceleration
+    :param props - record with max_speed, max_fall_speed and deceleration fields
     :param groups - groups character belongs to
+    :param PhysicsWorld world - physics world the character is simulated in
     """
-    def __init__(self, pos: tuple[float, float], props: dict[str, int], *groups):
-        super().__init__(pos[0], pos[1], groups)
+    __slots__ = ('health', 'ground_count', 'shoot_count', 'attack_count', 'direction', 'props')
+
+    def __init__(
+            self, pos: tuple[float, float], props: CharacterProps, *groups,
+            world: PhysicsWorld = None
+    ):
+        super().__init__(pos[0], pos[1], groups, world=world)
 
         self.health = 100
         self.ground_count = 0
@@ -21,17 +36,18 @@ class Character(PhysicsSprite):
         self.direction = 1
         self.props = props
 
-        self.set_max_speed(props.get('ms'))
-        self.set_max_fall_speed(props.get('mf'))
-        self.set_deceleration(props.get('dec'))
+        self.set_max_speed(props.max_speed)
+        self.set_max_fall_speed(props.max_fall_speed)
+        self.set_deceleration(props.deceleration)
 
     def update(self):
         """ Update method """
         super().update()
 
-        # constraint character motion within screen
-        if self.rect.left < 0:
-            self.pos.x = 0 + (self.rect.right - self.rect.left)/2
+        # constraint character motion within world
+        bounds = self.world.bounds
+        if self.rect.left < bounds.left:
+            self.pos.x = bounds.left + (self.rect.right - self.rect.left)/2
 
-        if self.rect.right > Window.WIDTH.value:
-            self.pos.x = Window.WIDTH.value - (self.rect.right - self.rect.left)/2
+        if self.rect.right > bounds.right:
+            self.pos.x = bounds.right - (self.rect.right - self.rect.left)/2
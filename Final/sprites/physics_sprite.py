@@ -1,10 +1,10 @@
 """ Module for imlpementing physics in sprite """
 
 from abc import ABC, abstractmethod
-import pygame as pg
+from math import hypot
 
-from constants import GRAVITY
 from .animated_sprite import AnimatedSprite
+from .physics_world import PhysicsWorld
 
 # pylint: disable=too-many-instance-attributes
 
@@ -14,23 +14,42 @@ class PhysicsSprite(ABC, AnimatedSprite):
     :param float x - x-position of sprite
     :param float y - y-position of sprite
     :param groups - list of sprite groups that sprite belongs to
+    :param PhysicsWorld world - shared world stepped by the screen, the sprite steps a
+        private world when None
     """
-    def __init__(self, x: float, y: float, *groups):
+    __slots__ = ('owns_world', 'world', 'body', 'pos', 'vel', 'acc')
+
+    def __init__(self, x: float, y: float, *groups, world: PhysicsWorld = None):
         super().__init__(groups)
 
+        self.owns_world = world is None
+        self.world = PhysicsWorld(1) if world is None else world
+        self.body = self.world.add(self, x, y)
+
         # vectors
-        self.pos = pg.math.Vector2(x, y)
-        self.vel = pg.math.Vector2(0, 0)
-        self.acc = pg.math.Vector2(0, 0)
+        self.pos = self.world.view('pos', self.body)
+        self.vel = self.world.view('vel', self.body)
+        self.acc = self.world.view('acc', self.body)
+
+    @property
+    def max_speed(self):
+        """ Method to get max speed of sprite """
+        return self.world.max_speed[self.body]
 
-        self.max_speed = 9999
-        self.max_fall_speed = 9999
-        self.deceleration = 0
+    @property
+    def max_fall_speed(self):
+        """ Method to get max fall speed of sprite """
+        return self.world.max_fall_speed[self.body]
+
+    @property
+    def deceleration(self):
+        """ Method to get slow down value of sprite """
+        return self.world.deceleration[self.body]
 
     @property
     def speed(self):
         """ Method to get speed from velocity vector """
-        return self.vel.length()
+        return hypot(self.vel.x, self.vel.y)
 
     @property
     def speedx(self):
@@ -57,62 +76,52 @@ class PhysicsSprite(ABC, AnimatedSprite):
 
         :param float s: magnitude of vel (new speed)
         """
-        if self.speed != 0:
+        speed = self.speed
+        if speed != 0:
             if s == 0:
-                self.vel = pg.math.Vector2(0, 0)
+                self.vel.x = 0
+                self.vel.y = 0
             else:
-                self.vel.scale_to_length(s)
+                self.vel.x *= s/speed
+                self.vel.y *= s/speed
 
     def set_max_speed(self, ms: float):
         """ Method to set max speed of sprite
 
         :param float ms: maximum speed to set sprite
         """
-        self.max_speed = ms
+        self.world.max_speed[self.body] = ms
 
     def set_max_fall_speed(self, ms: float):
         """ Method to set max fall speed of sprite
 
         :param float ms: maximum fall speed of sprite
         """
-        self.max_fall_speed = ms
+        self.world.max_fall_speed[self.body] = ms
 
     def set_deceleration(self, d: float):
         """ Method to set slow down value of sprite
 
         :param float d: deceleration value
         """
-        self.deceleration = d
+        self.world.deceleration[self.body] = d
 
     @abstractmethod
     def move(self):
         """ Method to control physics movement """
 
-    def update(self):
-        """ Method to update the sprite """
+    def apply_forces(self):
+        """ Method called by the world before integration, after gravity is applied """
+        # advance animation clock
         super().update()
 
-        # apply gravity
-        self.acc = pg.math.Vector2(0, GRAVITY)
-
         # movement
         self.move()
 
-        # apply acceleration
-        self.vel += self.acc
-
-        # apply friction
-        if abs(self.acc.x) < 0.01:
-            if self.speedx < self.deceleration:
-                self.speedx = 0
-            else:
-                self.speedx = self.speedx - self.deceleration
-
-        # cap speed in x and y
-        self.speedx = min(self.speedx, self.max_speed)
-        if self.vel.y > 0:
-            self.speedy = min(self.speedy, self.max_fall_speed)
+    def update(self):
+        """ Method to update the sprite, integration is done by the world """
+        if self.owns_world:
+            self.world.step()
 
         # apply velocity
-        self.pos += self.vel
         self.rect.midbottom = self.pos
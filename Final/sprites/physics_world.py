@@ -0,0 +1,189 @@
+""" Module for integrating physics sprites in batches """
+
+import numpy as np
+import pygame as pg
+
+from constants import GRAVITY, Window
+
+
+class BodyVector:
+    """ Class for viewing one row of a physics world array as an (x, y) vector
+
+    :param PhysicsWorld world - world that owns the array
+    :param str name - name of the world array ('pos', 'vel' or 'acc')
+    :param int index - row of the body in the world arrays
+    """
+    __slots__ = ('name', 'index', 'row')
+
+    def __init__(self, world, name: str, index: int):
+        self.name = name
+        self.index = index
+        self.row = getattr(world, name)[index]
+
+    @property
+    def x(self):
+        """ Method to get x component """
+        return self.row[0]
+
+    @x.setter
+    def x(self, value: float):
+        """ Method to set x component """
+        self.row[0] = value
+
+    @property
+    def y(self):
+        """ Method to get y component """
+        return self.row[1]
+
+    @y.setter
+    def y(self, value: float):
+        """ Method to set y component """
+        self.row[1] = value
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i: int):
+        return self.row[i]
+
+    def __iter__(self):
+        return iter((self.row[0], self.row[1]))
+
+    def __repr__(self):
+        return f'[{self.row[0]}, {self.row[1]}]'
+
+
+class PhysicsWorld:
+    """ Class for storing and integrating the physics state of many sprites
+
+    Position, velocity, acceleration and movement limits of every body are kept in
+    contiguous arrays, so gravity, friction, speed caps and integration are a handful of
+    array operations per tick. Sprites keep BodyVector views into their own rows.
+
+    :param int capacity - number of bodies to allocate room for
+    :param pg.Rect bounds - area bodies are kept inside, the window when None
+    """
+    ARRAYS = (
+        'pos', 'prev_pos', 'vel', 'acc', 'max_speed', 'max_fall_speed', 'deceleration', 'active'
+    )
+
+    def __init__(self, capacity: int = 64, bounds: pg.Rect = None):
+        self.count = 0
+        if bounds is None:
+            bounds = pg.Rect(0, 0, Window.WIDTH.value, Window.HEIGHT.value)
+        self.bounds = bounds
+
+        self.bodies = []
+        self.views = []
+
+        self.pos = np.zeros((capacity, 2))
+        self.prev_pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.acc = np.zeros((capacity, 2))
+        self.max_speed = np.full(capacity, 9999.0)
+        self.max_fall_speed = np.full(capacity, 9999.0)
+        self.deceleration = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    @property
+    def capacity(self):
+        """ Method to get number of bodies arrays have room for """
+        return len(self.active)
+
+    def grow(self):
+        """ Method for doubling array capacity and re-pointing body views """
+        capacity = self.capacity*2
+        for name in self.ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+        self.max_speed[self.count:] = 9999.0
+        self.max_fall_speed[self.count:] = 9999.0
+
+        for view in self.views:
+            view.row = getattr(self, view.name)[view.index]
+
+    def add(self, body, x: float, y: float):
+        """ Method for adding a body, returns its index
+        :param body - sprite stepped by this world, must provide apply_forces()
+        :param float x - x-position of body
+        :param float y - y-position of body
+        """
+        if self.count == self.capacity:
+            self.grow()
+
+        index = self.count
+        self.count += 1
+        self.bodies.append(body)
+
+        self.pos[index] = (x, y)
+        self.prev_pos[index] = (x, y)
+        self.active[index] = True
+        return index
+
+    def remove(self, index: int):
+        """ Method for removing a body from simulation
+        :param int index - index of body
+        """
+        self.bodies[index] = None
+        self.active[index] = False
+        self.vel[index] = 0
+        self.acc[index] = 0
+
+    def view(self, name: str, index: int):
+        """ Method for getting a vector view of a body row
+        :param str name - name of the world array ('pos', 'vel' or 'acc')
+        :param int index - index of body
+        """
+        vector = BodyVector(self, name, index)
+        self.views.append(vector)
+        return vector
+
+    def step(self):
+        """ Method for advancing every body by one tick """
+        n = self.count
+        self.prev_pos[:n] = self.pos[:n]
+
+        # apply gravity
+        self.acc[:n, 0] = 0
+        self.acc[:n, 1] = GRAVITY
+
+        # movement
+        for i in np.flatnonzero(self.active[:n]):
+            self.bodies[i].apply_forces()
+
+        self.integrate()
+
+    def integrate(self):
+        """ Method for applying acceleration, friction, speed caps and velocity """
+        n = self.count
+        active = self.active[:n]
+        pos, vel, acc = self.pos[:n], self.vel[:n], self.acc[:n]
+
+        # apply acceleration
+        new_vel = vel + acc
+        vx, vy = new_vel[:, 0], new_vel[:, 1]
+
+        # apply friction when not accelerating
+        speedx = np.abs(vx)
+        coasting = np.abs(acc[:, 0]) < 0.01
+        speedx = np.where(coasting, np.maximum(speedx - self.deceleration[:n], 0), speedx)
+
+        # cap speed in x and y
+        speedx = np.minimum(speedx, self.max_speed[:n])
+        vx[:] = np.where(vx > 0, speedx, -speedx)
+        falling = vy > 0
+        vy[falling] = np.minimum(vy[falling], self.max_fall_speed[:n][falling])
+
+        # apply velocity
+        np.copyto(vel, new_vel, where=active[:, None])
+        np.add(pos, vel, out=pos, where=active[:, None])
+
+    def interpolate(self, alpha: float):
+        """ Method for getting body positions between the previous and current tick
+        :param float alpha - fraction of a tick elapsed since the current tick
+        """
+        n = self.count
+        return self.prev_pos[:n] + (self.pos[:n] - self.prev_pos[:n])*alpha
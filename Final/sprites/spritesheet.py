@@ -3,10 +3,17 @@
 from enum import Enum
 import pygame as pg
 
+from constants import Window
+
 
 class Animation:
     """
     Class for configuring Animation
+
+    Mirrored frames and collision masks for both orientations are built once here so that
+    sprites can select them by frame index instead of flipping and rebuilding every tick.
+    Playback is counted in whole simulation ticks, and the frame, finished flag and next
+    tick of every playback tick are tabulated up front, so each lookup is one index.
     
     :param frames
     :param frame_duration
@@ -18,40 +25,58 @@ class Animation:
         LOOP = 2
 
     def __init__(self, frames: list[pg.Surface], frame_duration: float, mode: PlayMode):
-        self.frames = frames
+        self.frames = tuple(frames)
+        self.flipped_frames = tuple(pg.transform.flip(frame, True, False) for frame in frames)
+        self.masks = tuple(pg.mask.from_surface(frame) for frame in self.frames)
+        self.flipped_masks = tuple(pg.mask.from_surface(frame) for frame in self.flipped_frames)
         self.frame_duration = frame_duration
         self.animation_duration = len(self.frames)*self.frame_duration
         self.mode = mode
 
-    def get_frame(self, state_time: float):
+        # whole ticks each frame is shown for and ticks to play every frame once
+        self.frame_ticks = max(1, round(frame_duration*Window.TICK_RATE.value))
+        self.length = len(self.frames)*self.frame_ticks
+
+        self.schedule = ()
+        self.finished = ()
+        self.next_tick = ()
+        self.build_schedule()
+
+    def build_schedule(self):
+        """ Method for tabulating the frame index, finished flag and following tick of
+        every playback tick
+
+        Ticks before length play every frame once. A NORMAL animation then stays on tick
+        length, holding its last frame. A LOOP animation replays on ticks length to
+        2*length - 1 and wraps within them, so it stays finished once it has played through.
+        """
+        once = [tick//self.frame_ticks for tick in range(self.length)]
+        if self.mode == self.PlayMode.LOOP:
+            self.schedule = tuple(once*2)
+            self.finished = (False,)*self.length + (True,)*self.length
+            self.next_tick = tuple(range(1, 2*self.length)) + (self.length,)
+        else:
+            self.schedule = tuple(once + [len(self.frames) - 1])
+            self.finished = (False,)*self.length + (True,)
+            self.next_tick = tuple(range(1, self.length + 1)) + (self.length,)
+
+    def get_frame(self, tick: int):
         """ Method to get frame from list
-        :param float state_time - time elapsed to get index of frame
+        :param int tick - playback tick to get frame of
         """
-        frame_number = self.get_frame_index(state_time)
-        return self.frames[frame_number]
+        return self.frames[self.schedule[tick]]
 
-    def get_frame_index(self, state_time: float):
+    def get_frame_index(self, tick: int):
         """ Method to get index of frame in list
-        :param float state_time - time elapsed to get index of frame
+        :param int tick - playback tick to get index of frame of
         """
-        if len(self.frames) == 1:
-            return 0
-
-        frame_number = int(state_time/self.frame_duration)
-
-        if self.mode == self.PlayMode.NORMAL:
-            frame_number = min(len(self.frames) - 1, frame_number)
-        elif self.mode == self.PlayMode.LOOP:
-            frame_number = frame_number % len(self.frames)
-
-        return frame_number
+        return self.schedule[tick]
 
-    def is_animation_finished(self, state_time: float):
-        """ Method to check if on last frame
-        :param float state_time - time elapsed to get index of frame
+    def is_animation_finished(self, tick: int):
+        """ Method to check if every frame has been shown
+        :param int tick - playback tick to check
         """
-        frame_number = int(state_time/self.frame_duration)
-        return len(self.frames) - 1 < frame_number
+        return self.finished[tick]
 
 
 class SpriteSheet:
@@ -0,0 +1,78 @@
+""" Module for compiling animation state machines """
+
+from typing import Callable, NamedTuple
+
+
+class Transition(NamedTuple):
+    """ Move to a state when a guard holds, guard and action are called with the sprite """
+    target: str
+    guard: Callable = None
+    action: Callable = None
+
+
+class StateMachine:
+    """ Class for compiling tables of animation states into integer indexed transitions
+
+    States are numbered in the order they are listed. Every tick a sprite takes the first
+    transition of its state whose guard holds, trying the on-finish transitions first once
+    its animation has finished. A tick can pass through several states but only toward
+    higher numbers, so states are listed in the order transitions should cascade and a
+    transition to the same or an earlier state ends the tick.
+
+    :param dict states - state name to list of transitions
+    :param dict on_finish - state name to list of transitions taken once its animation
+        has finished
+    """
+    def __init__(self, states: dict[str, list], on_finish: dict[str, list] = None):
+        on_finish = {} if on_finish is None else on_finish
+
+        self.names = tuple(states)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.transitions = tuple(self.compile(states[name]) for name in self.names)
+        self.on_finish = tuple(self.compile(on_finish.get(name, ())) for name in self.names)
+
+    def compile(self, transitions: list[Transition]):
+        """ Method for resolving transition targets to state ids
+        :param list[Transition] transitions - transitions of a state
+        """
+        return tuple(
+            (transition.guard, self.ids[transition.target], transition.action)
+            for transition in transitions
+        )
+
+    def states(self, *names: str):
+        """ Method for getting the set of ids of named states
+        :param names - names of states
+        """
+        return frozenset(self.ids[name] for name in names)
+
+    @staticmethod
+    def take(sprite, transitions: tuple):
+        """ Method for taking the first transition whose guard holds, returns its target or
+        None if none was taken
+        :param sprite - animated sprite
+        :param tuple transitions - compiled transitions of the sprite's state
+        """
+        for guard, target, action in transitions:
+            if guard is None or guard(sprite):
+                if action is not None:
+                    action(sprite)
+                sprite.set_state(target)
+                return target
+        return None
+
+    def step(self, sprite):
+        """ Method for advancing a sprite through its transitions for one tick
+        :param sprite - animated sprite
+        """
+        state = sprite.state
+        while True:
+            target = None
+            if self.on_finish[state] and sprite.is_animation_finished():
+                target = self.take(sprite, self.on_finish[state])
+            if target is None:
+                target = self.take(sprite, self.transitions[state])
+
+            if target is None or target <= state:
+                return
+            state = target